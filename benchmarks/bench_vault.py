@@ -0,0 +1,54 @@
+# --- FILE: benchmarks/bench_vault.py ---
+# Reports vault compression ratio and restore latency per codec.
+# Usage: python benchmarks/bench_vault.py [size_mb]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import vault
+
+def make_instrument_csv(path, size_mb):
+    """Writes a synthetic time/temperature/voltage log of roughly `size_mb` MB."""
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    with open(path, "w") as f:
+        f.write("Time_s,Temp_C,Voltage_V,Current_mA\n")
+        t, temp = 0.0, 25.0
+        while f.tell() < target:
+            rows = []
+            for _ in range(10000):
+                t += 0.01
+                temp += rng.gauss(0, 0.02)
+                rows.append(f"{t:.2f},{temp:.4f},{3.3 + rng.gauss(0, 0.01):.5f},{rng.uniform(10, 12):.3f}\n")
+            f.write("".join(rows))
+
+def run(size_mb=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "run.csv")
+        make_instrument_csv(src, size_mb)
+        raw_size = os.path.getsize(src)
+        print(f"Source: {raw_size / 1e6:.1f} MB")
+        print(f"{'CODEC':<8}{'RATIO':>8}{'STORED MB':>12}{'SAVE s':>10}{'RESTORE s':>12}")
+
+        for name in vault.CODECS_BY_NAME:
+            vault_dir = os.path.join(tmp, f"vault_{name}")
+            os.makedirs(vault_dir)
+
+            t0 = time.perf_counter()
+            file_hash = vault.write_object(src, vault_dir, codec_name=name)
+            save_s = time.perf_counter() - t0
+
+            stored = os.path.getsize(vault.find_object(vault_dir, file_hash))
+            dest = os.path.join(tmp, f"restored_{name}.csv")
+            t0 = time.perf_counter()
+            vault.restore_object(vault_dir, file_hash, dest)
+            restore_s = time.perf_counter() - t0
+            assert os.path.getsize(dest) == raw_size
+
+            print(f"{name:<8}{raw_size / stored:>8.2f}{stored / 1e6:>12.1f}{save_s:>10.2f}{restore_s:>12.2f}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -14,6 +14,15 @@ class ConfigManager:
                 "save": [pygame.K_s, pygame.KMOD_CTRL],
                 "search": [pygame.K_f, pygame.KMOD_CTRL],
                 "analyze": [pygame.K_a, pygame.KMOD_NONE] # Single key example
+            },
+            "render_backend": "thread",  # "process": render plots in a warm process pool
+            "plot_mode": "fast",         # "statistical": seaborn lineplot (x-grouping + CIs); "native": zoomable pygame plot
+            "frame_cache_mb": 512,  # Parsed CSVs shared by plotting, analysis, diff and editor
+            "plot_cache_mb": 64,    # Rendered plot LRU (a disk tier lives in .sci_vault/plot_cache)
+            "watcher": {
+                "recursive": True,  # Acquisition software writes into dated subfolders
+                "include": ["*.csv", "*.xlsx"],
+                "exclude": [".*", "~$*", "*.tmp", "*.part", "*.partial"]
             }
         }
         self.data = self.load_config()
@@ -34,6 +43,9 @@ class ConfigManager:
     def get_hotkey(self, action_name):
         return self.data["hotkeys"].get(action_name, [0, 0])
 
+    def get_watcher_settings(self):
+        return {**self.defaults["watcher"], **self.data.get("watcher", {})}
+
     def set_theme(self, theme_name):
         self.data["theme"] = theme_name
         self.save_config()
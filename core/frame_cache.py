@@ -0,0 +1,105 @@
+# --- FILE: core/frame_cache.py ---
+# Process-wide cache of parsed CSVs so one selection doesn't parse the same file in
+# the placeholder analysis, the plot, the AI pass, the diff and the editor.
+import os
+import time
+import threading
+from collections import OrderedDict
+import pandas as pd
+from core.config import cfg
+from core.schema import read_options
+
+# Files modified this recently may still change within the same mtime tick
+RACY_WINDOW_NS = 2_000_000_000
+
+class FrameCache:
+    """LRU of DataFrames keyed by (path, inode, size, mtime_ns, nrows, columns) under a memory
+    budget. Frames handed out are shared: callers that mutate must ask for `copy=True`."""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {key: (df, nbytes)}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.loading = {}  # {key: Event} so concurrent readers of one file parse it once
+
+    @staticmethod
+    def _key(path, st, nrows, columns=None):
+        return (os.path.normcase(os.path.abspath(path)), st.st_ino, st.st_size, st.st_mtime_ns, nrows,
+                tuple(columns) if columns else None)
+
+    def read(self, path, nrows=None, copy=False, columns=None, schema=None):
+        st = os.stat(path)
+        key = self._key(path, st, nrows, columns)
+        full_key = self._key(path, st, nrows)
+        while True:
+            with self.lock:
+                hit = self.entries.get(key)
+                if hit:
+                    self.entries.move_to_end(key)
+                    return self._hand_out(hit[0], copy)
+                full = self.entries.get(full_key) if columns else None
+                if full and all(c in full[0].columns for c in columns):
+                    # Already parsed in full: project instead of re-reading
+                    return full[0][list(columns)].copy() if copy else full[0][list(columns)]
+                pending = self.loading.get(key)
+                if pending is None:
+                    self.loading[key] = threading.Event()
+                    break
+            pending.wait()
+
+        try:
+            df = self._parse(path, nrows, columns, schema)
+            if time.time_ns() - st.st_mtime_ns >= RACY_WINDOW_NS:
+                self._store(key, df)
+            return self._hand_out(df, copy)
+        finally:
+            with self.lock:
+                self.loading.pop(key).set()
+
+    @staticmethod
+    def _parse(path, nrows, columns, schema):
+        if not columns or schema is None:
+            return pd.read_csv(path, nrows=nrows)
+        options = read_options(schema, columns)
+        if nrows is not None:
+            options["engine"] = "c"  # pyarrow can't stop early
+            options["nrows"] = nrows
+        try:
+            return pd.read_csv(path, **options)
+        except (ValueError, TypeError):
+            # A value past the sniffed head doesn't fit the inferred type: let pandas infer
+            options.pop("dtype")
+            options["engine"] = "c"
+            return pd.read_csv(path, **options)
+
+    def _store(self, key, df):
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        with self.lock:
+            # Older versions of the same file can never be hit again
+            for old_key in [k for k in self.entries if k[0] == key[0] and k[1:4] != key[1:4]]:
+                self.total_bytes -= self.entries.pop(old_key)[1]
+            self.entries[key] = (df, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                _, (_, old_bytes) = self.entries.popitem(last=False)
+                self.total_bytes -= old_bytes
+
+    @staticmethod
+    def _hand_out(df, copy):
+        # A shallow copy keeps column assignment/renames on the caller's object away from
+        # the cached one; in-place value edits still need a deep copy.
+        return df.copy() if copy else df.copy(deep=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+frame_cache = FrameCache(cfg.data.get("frame_cache_mb", 512) * 1024 * 1024)
+
+def read_frame(path, nrows=None, copy=False, columns=None, schema=None):
+    """pd.read_csv through the shared cache. Pass copy=True before editing the frame in place.
+    With `columns` and a core.schema schema, only those columns are parsed, with explicit dtypes."""
+    return frame_cache.read(path, nrows=nrows, copy=copy, columns=columns, schema=schema)
@@ -1,20 +1,47 @@
 import hashlib
+import json
 import os
-import shutil
+import threading
 import time
+from contextlib import contextmanager
+from core import vault
 
-def get_file_hash(path: str) -> str:
-    """Generates a SHA-256 hash of a file's content with retry logic."""
-    if not os.path.exists(path): 
-        return None
-    
-    sha256_hash = hashlib.sha256()
+# Large reads keep syscall overhead low on multi-hundred-MB instrument CSVs.
+CHUNK_SIZE = 1024 * 1024
+
+# One reusable buffer per thread (workers may hash concurrently).
+_local = threading.local()
+
+HASH_CACHE_FILE = "hash_cache.json"
+MAX_CACHE_ENTRIES = 10000
+# Entries recorded within this window of the file's mtime are "racy": a rewrite
+# in the same timestamp tick would be invisible, so they are never trusted.
+RACY_WINDOW_NS = 2_000_000_000
+
+def _get_buffer():
+    buf = getattr(_local, "buffer", None)
+    if buf is None:
+        buf = bytearray(CHUNK_SIZE)
+        _local.buffer = buf
+    return buf
+
+def _stream_file(src, sha256_hash):
+    """Feeds `src` into the hash using the thread's buffer."""
+    buf = _get_buffer()
+    view = memoryview(buf)
+    while True:
+        n = src.readinto(buf)
+        if not n:
+            break
+        sha256_hash.update(view[:n])
+
+def _hash_file(path: str) -> str:
     attempts = 0
     while attempts < 3:
         try:
+            sha256_hash = hashlib.sha256()
             with open(path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
+                _stream_file(f, sha256_hash)
             return sha256_hash.hexdigest()
         except PermissionError:
             time.sleep(0.1)
@@ -23,24 +50,174 @@ def get_file_hash(path: str) -> str:
             return None
     return None
 
+class HashCache:
+    """Persistent SHA-256 cache keyed by (inode, size, mtime_ns), stored as a vault sidecar."""
+    def __init__(self, vault_dir):
+        self.path = os.path.join(vault_dir, HASH_CACHE_FILE)
+        self.lock = threading.Lock()
+        self.entries = self._load()
+        self.dirty = False
+        # While > 0, records stay in memory and are written once by the outermost batch
+        self.batch_depth = 0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _stat_key(st):
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def lookup(self, path, st):
+        """Returns the stored hash if the file is provably unchanged, else None."""
+        with self.lock:
+            entry = self.entries.get(self._key(path))
+        if not entry or entry["stat"] != self._stat_key(st):
+            return None
+        if entry["recorded_ns"] - st.st_mtime_ns < RACY_WINDOW_NS:
+            return None
+        return entry["hash"]
+
+    def record(self, path, st, file_hash):
+        """Stores the hash, unless the file changed since `st` was taken."""
+        try:
+            if self._stat_key(os.stat(path)) != self._stat_key(st):
+                return
+        except OSError:
+            return
+        with self.lock:
+            key = self._key(path)
+            known = self.entries.get(key)
+            self.entries[key] = {
+                "stat": self._stat_key(st),
+                "hash": file_hash,
+                "recorded_ns": time.time_ns()
+            }
+            if len(self.entries) > MAX_CACHE_ENTRIES:
+                oldest = sorted(self.entries, key=lambda k: self.entries[k]["recorded_ns"])
+                for k in oldest[:len(self.entries) - MAX_CACHE_ENTRIES]:
+                    del self.entries[k]
+            self.dirty = True
+            # A re-record of a known (stat, hash) only refreshes recorded_ns; losing that
+            # just costs one more hash, so it waits for the next save instead of forcing one
+            unchanged = known is not None and known["stat"] == self._stat_key(st) and known["hash"] == file_hash
+            if self.batch_depth or unchanged:
+                return
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.dirty:
+            return
+        try:
+            self._save()
+            self.dirty = False
+        except OSError as e:
+            print(f"Hash Cache Save Failed: {e}")
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    @contextmanager
+    def batch(self):
+        """Defers saving until the outermost batch exits, so bulk hashing writes the file once."""
+        with self.lock:
+            self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.batch_depth -= 1
+                if not self.batch_depth:
+                    self._flush_locked()
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_hash_cache(project_path: str) -> HashCache:
+    vault_dir = ensure_vault(project_path)
+    with _caches_lock:
+        if vault_dir not in _caches:
+            _caches[vault_dir] = HashCache(vault_dir)
+        return _caches[vault_dir]
+
+def flush_hash_caches():
+    """Writes out any records still held in memory (called on shutdown)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.flush()
+
+def get_file_hash(path: str, project_path: str = None) -> str:
+    """Generates a SHA-256 hash of a file's content with retry logic.
+    With a project_path, unchanged files are answered from the stat-keyed cache."""
+    if not os.path.exists(path):
+        return None
+    if not project_path:
+        return _hash_file(path)
+
+    cache = get_hash_cache(project_path)
+    st = os.stat(path)
+    file_hash = cache.lookup(path, st)
+    if file_hash:
+        return file_hash
+    file_hash = _hash_file(path)
+    if file_hash:
+        cache.record(path, st, file_hash)
+    return file_hash
+
+def remember_file_hash(path: str, file_hash: str, project_path: str):
+    """Records a hash already known to match `path` (e.g. after restoring from the vault)."""
+    try:
+        get_hash_cache(project_path).record(path, os.stat(path), file_hash)
+    except OSError:
+        pass
+
 def ensure_vault(project_path: str) -> str:
-    vault_path = os.path.join(project_path, ".sci_vault")
-    os.makedirs(vault_path, exist_ok=True)
-    return vault_path
-
-def save_to_vault(file_path: str, project_path: str) -> str:
-    """Copies file to vault named by its hash."""
-    file_hash = get_file_hash(file_path)
-    if not file_hash: return None
-    
+    return vault.open_vault(project_path)
+
+def save_to_vault(file_path: str, project_path: str, base_hash: str = None) -> str:
+    """Stores a compressed copy in the vault named by its hash (hash and copy in one pass).
+    Files whose stat tuple matches the hash cache skip I/O entirely. With a `base_hash`
+    (the node's previous version) the copy is stored as a row delta when that pays off."""
+    if not os.path.exists(file_path):
+        return None
+
     vault_dir = ensure_vault(project_path)
-    dest = os.path.join(vault_dir, f"{file_hash}.csv")
-    
-    if not os.path.exists(dest):
+    cache = get_hash_cache(project_path)
+    st = os.stat(file_path)
+    cached_hash = cache.lookup(file_path, st)
+    if cached_hash and vault.has_object(vault_dir, cached_hash):
+        return cached_hash
+
+    attempts = 0
+    while attempts < 3:
         try:
-            shutil.copy2(file_path, dest)
+            if base_hash:
+                file_hash = vault.write_delta_object(file_path, vault_dir, base_hash)
+            else:
+                file_hash = vault.write_object(file_path, vault_dir)
+            cache.record(file_path, st, file_hash)
+            return file_hash
+        except PermissionError:
+            time.sleep(0.1)
+            attempts += 1
         except Exception as e:
             print(f"Vault Backup Failed: {e}")
             return None
-            
-    return file_hash
\ No newline at end of file
+    return None
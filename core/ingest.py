@@ -0,0 +1,129 @@
+# --- FILE: core/ingest.py ---
+# Staged bulk ingest: hash (threads) -> parse (processes) -> one DB transaction (caller).
+import os
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+# Measured costs that decide between parse threads and a spawn process pool. A spawned
+# worker re-imports the entry script (main.py pulls in pygame, matplotlib and openai):
+# about 2.5 s before it parses anything. One core parses CSV at about 70 MB/s.
+SPAWN_START_S = 2.5
+PARSE_MB_PER_S = 70.0
+
+def use_process_pool(total_bytes, max_workers):
+    """True when spreading the parse over processes saves more than they take to start."""
+    if max_workers < 2:
+        return False
+    serial_s = total_bytes / (1024 * 1024) / PARSE_MB_PER_S
+    return serial_s * (1 - 1 / max_workers) > SPAWN_START_S
+
+# Quantiles stored in every numeric column profile
+PROFILE_PERCENTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def _finite(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+def profile_frame(df):
+    """JSON-ready column profile: shape, then per column dtype/count/nulls, plus
+    min/max/mean/std/quantiles for numeric columns (one vectorized describe)."""
+    counts = df.count()
+    columns = {
+        str(c): {"dtype": str(df[c].dtype), "count": int(counts[c]), "nulls": int(len(df) - counts[c])}
+        for c in df.columns
+    }
+    numeric = df.select_dtypes(include=['number'])
+    if len(numeric.columns):
+        desc = numeric.describe(percentiles=list(PROFILE_PERCENTILES))
+        for c in numeric.columns:
+            stats = desc[c]
+            columns[str(c)].update({
+                "min": _finite(stats["min"]), "max": _finite(stats["max"]),
+                "mean": _finite(stats["mean"]), "std": _finite(stats["std"]),
+                "quantiles": {f"{q:g}": _finite(stats[f"{q * 100:g}%"]) for q in PROFILE_PERCENTILES}
+            })
+    return {"rows": len(df), "cols": len(df.columns), "columns": columns}
+
+def profile_numeric_columns(profile):
+    return [c for c, info in profile["columns"].items() if "mean" in info]
+
+def parse_file_stats(path):
+    """Runs in a worker process; returns the table shape and column profile (plain dicts pickle cheaply)."""
+    try:
+        df = pd.read_csv(path)
+        return {"rows": len(df), "cols": len(df.columns), "profile": profile_frame(df)}
+    except Exception as e:
+        return {"error": str(e)}
+
+class IngestProgress:
+    """Per-stage throughput, reported through `callback(stage, done, total, files_s, mb_s)`."""
+    def __init__(self, callback, min_interval=0.2):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.last_report = 0.0
+
+    def start(self, stage, total):
+        self.stage, self.total = stage, total
+        self.done, self.bytes_done = 0, 0
+        self.t0 = time.perf_counter()
+
+    def advance(self, n_bytes):
+        self.done += 1
+        self.bytes_done += n_bytes
+        now = time.perf_counter()
+        if self.callback and (now - self.last_report >= self.min_interval or self.done == self.total):
+            self.last_report = now
+            self.callback(self.stage, self.done, self.total, *self.rates())
+
+    def rates(self):
+        elapsed = max(time.perf_counter() - self.t0, 1e-6)
+        return self.done / elapsed, self.bytes_done / (1024 * 1024) / elapsed
+
+def run_pipeline(paths, hash_func, parse_paths, on_progress=None, max_workers=None):
+    """Hashes every path, then parses `parse_paths` (a subset). Returns
+    ({path: (size, mtime_ns, hash)}, {path: stats}, (files_s, mb_s)) for the whole run."""
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    progress = IngestProgress(on_progress)
+    t0 = time.perf_counter()
+
+    # 1. Hash (hashlib releases the GIL, so threads saturate the disk)
+    stats = {}
+    for path in paths:
+        try:
+            stats[path] = os.stat(path)
+        except OSError:
+            pass
+    hashed = {}
+    progress.start("HASH", len(stats))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(hash_func, path): path for path in stats}
+        for fut in as_completed(futures):
+            path = futures[fut]
+            st = stats[path]
+            file_hash = fut.result()
+            if file_hash:
+                hashed[path] = (st.st_size, st.st_mtime_ns, file_hash)
+            progress.advance(st.st_size)
+
+    # 2. Parse (the CSV tokenizer holds the GIL, so large batches go to processes)
+    parse_paths = [p for p in parse_paths if p in hashed]
+    parsed = {}
+    progress.start("PARSE", len(parse_paths))
+    if use_process_pool(sum(hashed[p][0] for p in parse_paths), max_workers):
+        # Spawn, not fork: this runs on a worker thread of a multi-threaded process
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    with executor as pool:
+        futures = {pool.submit(parse_file_stats, path): path for path in parse_paths}
+        for fut in as_completed(futures):
+            path = futures[fut]
+            parsed[path] = fut.result()
+            progress.advance(hashed[path][0])
+
+    elapsed = max(time.perf_counter() - t0, 1e-6)
+    total_mb = sum(hashed[p][0] for p in parse_paths) / (1024 * 1024)
+    return hashed, parsed, (len(parse_paths) / elapsed, total_mb / elapsed)
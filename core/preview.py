@@ -0,0 +1,98 @@
+# --- FILE: core/preview.py ---
+# Whole-file preview for CSVs too large to plot in full: one chunked pass keeps a stride
+# sample plus every chunk's min/max rows per numeric column, so late drift and spikes
+# still show. Memory is bounded by one chunk plus the sample; results are cached by hash.
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from core.schema import numeric_columns
+
+PREVIEW_MIN_BYTES = 50 * 1024 * 1024
+PREVIEW_ROWS = 50_000
+CHUNK_ROWS = 200_000
+PREVIEW_DIRNAME = "previews"
+
+def build_preview(path, schema, target_rows=PREVIEW_ROWS, chunk_rows=CHUNK_ROWS, cancel_token=None):
+    """Returns (preview_df, info) with the original row numbers as the index, or (None, None)
+    if there are no numeric columns or the token was cancelled mid-pass."""
+    columns = numeric_columns(schema)
+    if not columns:
+        return None, None
+
+    stride = 1
+    sample, envelopes = [], []
+    sampled = 0
+    start = 0
+    reader = pd.read_csv(path, sep=schema["delimiter"], usecols=columns, chunksize=chunk_rows)
+    for chunk in reader:
+        if cancel_token and cancel_token.cancelled:
+            reader.close()
+            return None, None
+        chunk = chunk.apply(pd.to_numeric, errors="coerce")
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+
+        # Envelope: the rows holding each column's extremes in this chunk
+        values = chunk.to_numpy(dtype=np.float64)
+        nan = np.isnan(values)
+        extremes = np.unique(np.concatenate([
+            np.where(nan, np.inf, values).argmin(axis=0),
+            np.where(nan, -np.inf, values).argmax(axis=0)
+        ]))
+        envelopes.append(chunk.iloc[extremes])
+
+        kept = chunk[chunk.index % stride == 0]
+        sample.append(kept)
+        sampled += len(kept)
+        if sampled > 2 * target_rows:
+            # Double the stride and thin what is already kept, so the sample stays bounded
+            stride *= 2
+            sample = [part[part.index % stride == 0] for part in sample]
+            sampled = sum(len(part) for part in sample)
+
+    if not start:
+        return None, None
+    preview = pd.concat(sample + envelopes)
+    preview = preview[~preview.index.duplicated()].sort_index()
+    info = {"rows": start, "shown": len(preview), "stride": stride, "chunks": len(envelopes)}
+    return preview, info
+
+def _preview_path(vault_dir, file_hash):
+    return os.path.join(vault_dir, PREVIEW_DIRNAME, file_hash + ".npz")
+
+def load_preview(vault_dir, file_hash):
+    path = _preview_path(vault_dir, file_hash)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            info = json.loads(str(data["info"]))
+            columns = info.pop("columns")
+            preview = pd.DataFrame({c: data[f"col_{i}"] for i, c in enumerate(columns)}, index=data["rows"])
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        print(f"Preview Cache Read Failed ({file_hash[:8]}): {e}")
+        return None, None
+    return preview, info
+
+def save_preview(vault_dir, file_hash, preview, info):
+    path = _preview_path(vault_dir, file_hash)
+    tmp_path = f"{path}.{threading.get_ident()}.part.npz"
+    arrays = {f"col_{i}": preview[c].to_numpy() for i, c in enumerate(preview.columns)}
+    header = json.dumps({**info, "columns": [str(c) for c in preview.columns]})
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(tmp_path, rows=preview.index.to_numpy(), info=np.array(header), **arrays)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Preview Cache Write Failed: {e}")
+
+def get_preview(path, file_hash, schema, vault_dir, cancel_token=None):
+    """Cached whole-file preview for this content, built in one pass on first request."""
+    preview, info = load_preview(vault_dir, file_hash)
+    if preview is None:
+        preview, info = build_preview(path, schema, cancel_token=cancel_token)
+        if preview is not None:
+            save_preview(vault_dir, file_hash, preview, info)
+    return preview, info
@@ -1,7 +1,7 @@
 from fpdf import FPDF
 import os
-import pandas as pd
 from settings import UITheme
+from core.frame_cache import read_frame
 
 class PDFReport(FPDF):
     def __init__(self):
@@ -80,8 +80,8 @@ class DiffEngine:
         Returns: List of (text, color) tuples.
         """
         try:
-            df_a = pd.read_csv(file_path_a)
-            df_b = pd.read_csv(file_path_b)
+            df_a = read_frame(file_path_a)
+            df_b = read_frame(file_path_b)
         except Exception as e:
             return [("Error reading files for diff.", (255, 0, 0))]
 
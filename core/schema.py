@@ -0,0 +1,106 @@
+# --- FILE: core/schema.py ---
+# CSV schema (delimiter, column names, inferred dtypes) per content hash, so plot loads
+# read only the axes they draw with explicit types instead of inferring every column.
+import csv
+import json
+import os
+import threading
+import pandas as pd
+from core.hashing import ensure_vault
+
+try:
+    import pyarrow  # noqa: F401  (multithreaded CSV reader, used when installed)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+SCHEMA_CACHE_FILE = "schema_cache.json"
+MAX_SCHEMA_ENTRIES = 10000
+SNIFF_BYTES = 64 * 1024
+INFER_ROWS = 1000
+
+def sniff_schema(path):
+    """Delimiter from csv.Sniffer, dtypes from the first INFER_ROWS rows."""
+    with open(path, "r", newline="", errors="replace") as f:
+        sample = f.read(SNIFF_BYTES)
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+    head = pd.read_csv(path, sep=delimiter, nrows=INFER_ROWS)
+    return {
+        "delimiter": delimiter,
+        "columns": [str(c) for c in head.columns],
+        "dtypes": {str(c): str(t) for c, t in head.dtypes.items()}
+    }
+
+def numeric_columns(schema):
+    return [c for c in schema["columns"] if schema["dtypes"][c].startswith(("int", "uint", "float"))]
+
+def read_options(schema, columns):
+    """pd.read_csv kwargs for a projected, typed read of `columns`.
+    Numeric columns read as float64 so NaNs past the inferred head still fit."""
+    numeric = set(numeric_columns(schema))
+    return {
+        "sep": schema["delimiter"],
+        "usecols": list(columns),
+        "dtype": {c: "float64" for c in columns if c in numeric},
+        "engine": CSV_ENGINE
+    }
+
+class SchemaCache:
+    """Content-hash -> schema, stored as a vault sidecar. Entries never go stale."""
+    def __init__(self, vault_dir):
+        self.path = os.path.join(vault_dir, SCHEMA_CACHE_FILE)
+        self.lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, file_hash):
+        with self.lock:
+            return self.entries.get(file_hash)
+
+    def put(self, file_hash, schema):
+        with self.lock:
+            self.entries[file_hash] = schema
+            while len(self.entries) > MAX_SCHEMA_ENTRIES:
+                del self.entries[next(iter(self.entries))]
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Schema Cache Save Failed: {e}")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_schema(path, file_hash, project_path):
+    """Cached schema for this content, sniffing it on first sight. None if unreadable."""
+    vault_dir = ensure_vault(project_path)
+    with _caches_lock:
+        if vault_dir not in _caches:
+            _caches[vault_dir] = SchemaCache(vault_dir)
+        cache = _caches[vault_dir]
+
+    schema = cache.get(file_hash)
+    if schema is None:
+        try:
+            schema = sniff_schema(path)
+        except Exception as e:
+            print(f"Schema Sniff Failed ({os.path.basename(path)}): {e}")
+            return None
+        cache.put(file_hash, schema)
+    return schema
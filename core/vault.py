@@ -0,0 +1,649 @@
+import difflib
+import hashlib
+import io
+import json
+import lzma
+import multiprocessing
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+
+# Object layout: MAGIC | codec id (1 byte) | object kind (1 byte) | payload.
+# Files without MAGIC are legacy raw copies and are read back as-is.
+MAGIC = b"\x89SGV"
+HEADER_SIZE = len(MAGIC) + 2
+KIND_FULL = 0
+KIND_DELTA = 1
+
+# Delta payload: base hash | chain depth | op count, then per op the base byte
+# range it replaces and the replacement bytes.
+DELTA_HEADER = struct.Struct(">64sHI")
+DELTA_OP = struct.Struct(">QQQ")
+MAX_DELTA_CHAIN = 8               # A full snapshot is forced after this many deltas
+DELTA_PEEK_SIZE = 4096            # Compressed bytes read at a time to reach a delta's header
+DELTA_MAX_BYTES = 256 * 1024 * 1024  # Larger files are always stored in full
+DELTA_MAX_RATIO = 0.5             # Deltas bigger than this fraction of the file aren't worth it
+DIFFLIB_MAX_LINES = 20000         # Line-matching budget when rows were inserted/removed
+
+# Objects live in a git-style fan-out: <vault>/ab/cdef... (first two hex chars
+# of the hash pick the shard). Older vaults stored <hash>.obj or raw <hash>.csv
+# files flat in the vault root; migrate_flat_layout moves them on first open.
+VAULT_DIRNAME = ".sci_vault"
+LAYOUT_FILE = "layout"
+LAYOUT_VERSION = "sharded-v1"
+SHARD_RE = re.compile(r"^[0-9a-f]{2}$")
+SHARDED_NAME_RE = re.compile(r"^[0-9a-f]{62}$")
+FLAT_NAME_RE = re.compile(r"^([0-9a-f]{64})(\.obj|\.csv)$")
+
+# Packfiles: small objects concatenated into pack/pack-<id>.pack with a JSON
+# index pack-<id>.idx mapping hash -> [offset, length, mtime_ns].
+PACK_DIR = "pack"
+PACK_MAX_OBJECT = 1024 * 1024    # Only objects up to this stored size get packed
+GC_GRACE_SECONDS = 600           # Loose objects younger than this are never collected
+
+class _Passthrough:
+    def compress(self, data): return bytes(data)
+    def decompress(self, data): return bytes(data)
+    def flush(self): return b""
+
+class Codec:
+    def __init__(self, codec_id, name, compressor, decompressor):
+        self.id = codec_id
+        self.name = name
+        self.compressor = compressor
+        self.decompressor = decompressor
+
+CODECS_BY_ID = {}
+CODECS_BY_NAME = {}
+
+def register_codec(codec_id, name, compressor, decompressor):
+    """Registers a streaming codec. Factories must return objects with the
+    compressobj/decompressobj interface (compress/decompress + optional flush)."""
+    codec = Codec(codec_id, name, compressor, decompressor)
+    CODECS_BY_ID[codec_id] = codec
+    CODECS_BY_NAME[name] = codec
+    return codec
+
+register_codec(0, "raw", _Passthrough, _Passthrough)
+# Level 1: ~10x faster than the default level on CSV for ~20% less compression;
+# saves sit on the interactive path.
+register_codec(1, "zlib", lambda: zlib.compressobj(1), zlib.decompressobj)
+register_codec(2, "lzma", lambda: lzma.LZMACompressor(preset=1), lzma.LZMADecompressor)
+
+DEFAULT_CODEC = "zlib"
+
+def object_path(vault_dir: str, file_hash: str) -> str:
+    return os.path.join(vault_dir, file_hash[:2], file_hash[2:])
+
+def find_object(vault_dir: str, file_hash: str) -> str:
+    """Returns the on-disk path of a loose object, or None."""
+    path = object_path(vault_dir, file_hash)
+    return path if os.path.exists(path) else None
+
+def has_object(vault_dir: str, file_hash: str) -> bool:
+    return find_object(vault_dir, file_hash) is not None or file_hash in _load_pack_index(vault_dir)
+
+# --- LAYOUT ---
+_opened_vaults = set()
+_open_lock = threading.Lock()
+
+def migrate_flat_layout(vault_dir: str) -> int:
+    """One-time move of flat <hash>.obj / <hash>.csv objects into shard directories."""
+    marker = os.path.join(vault_dir, LAYOUT_FILE)
+    if os.path.exists(marker):
+        return 0
+
+    moved = 0
+    for name in os.listdir(vault_dir):
+        m = FLAT_NAME_RE.match(name)
+        if not m:
+            continue
+        src = os.path.join(vault_dir, name)
+        dest = object_path(vault_dir, m.group(1))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.exists(dest):
+            os.remove(src)
+        else:
+            os.replace(src, dest)  # Legacy raw copies keep their content; the reader detects them
+        moved += 1
+
+    with open(marker, "w") as f:
+        f.write(LAYOUT_VERSION)
+    return moved
+
+def open_vault(project_path: str) -> str:
+    """Returns the project's vault directory, creating or migrating it on first use."""
+    vault_dir = os.path.join(project_path, VAULT_DIRNAME)
+    with _open_lock:
+        if vault_dir not in _opened_vaults:
+            os.makedirs(vault_dir, exist_ok=True)
+            moved = migrate_flat_layout(vault_dir)
+            if moved:
+                print(f"Vault migrated to sharded layout ({moved} objects).")
+            _opened_vaults.add(vault_dir)
+    return vault_dir
+
+# --- PACKS ---
+_pack_lock = threading.Lock()
+_pack_indexes = {}  # vault_dir -> {hash: (pack_path, offset, length, mtime_ns)}
+
+def _load_pack_index(vault_dir):
+    """Merged in-memory index of every pack in the vault. Built once per vault; packs are
+    only written or removed by collect_garbage, which invalidates it."""
+    with _pack_lock:
+        cached = _pack_indexes.get(vault_dir)
+    if cached is not None:
+        return cached
+
+    pack_dir = os.path.join(vault_dir, PACK_DIR)
+    try:
+        names = sorted(n for n in os.listdir(pack_dir) if n.endswith(".idx"))
+    except FileNotFoundError:
+        names = []
+    index = {}
+    for name in names:
+        pack_path = os.path.join(pack_dir, name[:-4] + ".pack")
+        with open(os.path.join(pack_dir, name), "r") as f:
+            for file_hash, (offset, length, mtime_ns) in json.load(f).items():
+                index[file_hash] = (pack_path, offset, length, mtime_ns)
+    with _pack_lock:
+        _pack_indexes[vault_dir] = index
+    return index
+
+def _invalidate_pack_index(vault_dir):
+    with _pack_lock:
+        _pack_indexes.pop(vault_dir, None)
+
+def _read_packed(entry):
+    pack_path, offset, length, _ = entry
+    with open(pack_path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+def _open_object(vault_dir, file_hash):
+    """Opens the stored (still encoded) bytes of an object, loose or packed."""
+    path = find_object(vault_dir, file_hash)
+    if path:
+        return open(path, "rb")
+    entry = _load_pack_index(vault_dir).get(file_hash)
+    if entry is None:
+        raise FileNotFoundError(f"Vault object {file_hash} not found")
+    return io.BytesIO(_read_packed(entry))
+
+def _install_object(vault_dir, file_hash, write_body, stat_src):
+    """Writes an object through a temp file and renames it into place. With file_hash=None
+    the hash is whatever `write_body` returns (known only once the body is written)."""
+    fd, tmp_path = tempfile.mkstemp(dir=vault_dir, prefix=".incoming_", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            file_hash = write_body(dst) or file_hash
+        if has_object(vault_dir, file_hash):
+            os.remove(tmp_path)
+        else:
+            shutil.copystat(stat_src, tmp_path)
+            dest = object_path(vault_dir, file_hash)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp_path, dest)  # Atomic: readers never see a half-written object
+        return file_hash
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_object(file_path: str, vault_dir: str, codec_name: str = DEFAULT_CODEC) -> str:
+    """Hashes and compresses the file in one pass into a temp file, then renames it into place."""
+    codec = CODECS_BY_NAME[codec_name]
+
+    def write_body(dst):
+        sha256_hash = hashlib.sha256()
+        compressor = codec.compressor()
+        with open(file_path, "rb") as src:
+            dst.write(MAGIC + bytes([codec.id, KIND_FULL]))
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                sha256_hash.update(chunk)
+                dst.write(compressor.compress(chunk))
+            dst.write(compressor.flush())
+        return sha256_hash.hexdigest()
+
+    return _install_object(vault_dir, None, write_body, file_path)
+
+def _write_compressed(dst, codec, kind, parts):
+    compressor = codec.compressor()
+    dst.write(MAGIC + bytes([codec.id, kind]))
+    for part in parts:
+        dst.write(compressor.compress(part))
+    dst.write(compressor.flush())
+
+# --- DELTAS ---
+def _common_prefix_len(a, b):
+    n = min(len(a), len(b))
+    lo = 0
+    while lo + CHUNK_SIZE <= n and a[lo:lo + CHUNK_SIZE] == b[lo:lo + CHUNK_SIZE]:
+        lo += CHUNK_SIZE
+    hi = min(lo + CHUNK_SIZE, n)
+    # Binary search for the first mismatch inside the last chunk
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _line_offsets(lines, start):
+    offsets = [start]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+def compute_delta(base: bytes, new: bytes):
+    """Returns [(base_start, base_end, replacement)] byte ops turning `base` into `new`.
+    Ops always cover whole rows; unchanged rows are never stored."""
+    # 1. Trim the unchanged head and tail, snapped back to row boundaries
+    prefix = _common_prefix_len(base, new)
+    prefix = base.rfind(b"\n", 0, prefix) + 1
+    limit = min(len(base), len(new)) - prefix
+    suffix = _common_prefix_len(base[len(base) - limit:][::-1], new[len(new) - limit:][::-1])
+    if suffix < len(base) - prefix:
+        cut = base.find(b"\n", len(base) - suffix - 1)
+        suffix = len(base) - cut - 1 if cut != -1 else 0
+    base_end, new_end = len(base) - suffix, len(new) - suffix
+    if prefix >= base_end and prefix >= new_end:
+        return []
+
+    # 2. Diff the changed middle row by row
+    base_lines = base[prefix:base_end].splitlines(keepends=True)
+    new_lines = new[prefix:new_end].splitlines(keepends=True)
+    if len(base_lines) == len(new_lines):
+        opcodes = []
+        i = 0
+        while i < len(base_lines):
+            if base_lines[i] == new_lines[i]:
+                i += 1
+                continue
+            j = i
+            while j < len(base_lines) and base_lines[j] != new_lines[j]:
+                j += 1
+            opcodes.append((i, j, i, j))
+            i = j
+    elif max(len(base_lines), len(new_lines)) <= DIFFLIB_MAX_LINES:
+        matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+        opcodes = [(i1, i2, j1, j2) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+    else:
+        return [(prefix, base_end, new[prefix:new_end])]
+
+    base_offsets = _line_offsets(base_lines, prefix)
+    return [(base_offsets[i1], base_offsets[i2], b"".join(new_lines[j1:j2])) for i1, i2, j1, j2 in opcodes]
+
+def apply_delta(base: bytes, ops) -> bytes:
+    base_view = memoryview(base)
+    out = []
+    pos = 0
+    for start, end, replacement in ops:
+        out.append(base_view[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(base_view[pos:])
+    return b"".join(out)
+
+def _encode_delta(base_hash, depth, ops):
+    yield DELTA_HEADER.pack(base_hash.encode("ascii"), depth, len(ops))
+    for start, end, replacement in ops:
+        yield DELTA_OP.pack(start, end, len(replacement))
+        yield replacement
+
+def _decode_delta(payload):
+    base_hash, depth, n_ops = DELTA_HEADER.unpack_from(payload, 0)
+    pos = DELTA_HEADER.size
+    ops = []
+    for _ in range(n_ops):
+        start, end, length = DELTA_OP.unpack_from(payload, pos)
+        pos += DELTA_OP.size
+        ops.append((start, end, payload[pos:pos + length]))
+        pos += length
+    return base_hash.decode("ascii"), depth, ops
+
+def write_delta_object(file_path: str, vault_dir: str, base_hash: str, codec_name: str = DEFAULT_CODEC) -> str:
+    """Stores the file as a row patch against `base_hash` when that is small and the
+    delta chain is short enough; otherwise falls back to a full snapshot."""
+    if not base_hash or not has_object(vault_dir, base_hash) or os.path.getsize(file_path) > DELTA_MAX_BYTES:
+        return write_object(file_path, vault_dir, codec_name)
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+    file_hash = hashlib.sha256(data).hexdigest()
+    if has_object(vault_dir, file_hash):
+        return file_hash
+
+    depth = object_depth(vault_dir, base_hash) + 1
+    if depth > MAX_DELTA_CHAIN:
+        return write_object(file_path, vault_dir, codec_name)
+
+    ops = compute_delta(read_object(vault_dir, base_hash), data)
+    patch_size = sum(DELTA_OP.size + len(r) for _, _, r in ops)
+    if patch_size > len(data) * DELTA_MAX_RATIO:
+        return write_object(file_path, vault_dir, codec_name)
+
+    codec = CODECS_BY_NAME[codec_name]
+    _install_object(vault_dir, file_hash,
+                    lambda dst: _write_compressed(dst, codec, KIND_DELTA, _encode_delta(base_hash, depth, ops)),
+                    file_path)
+    return file_hash
+
+# --- READING ---
+def _iter_decompressed(f, codec):
+    decompressor = codec.decompressor()
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        out = decompressor.decompress(chunk)
+        if out:
+            yield out
+    flush = getattr(decompressor, "flush", None)
+    if flush:
+        tail = flush()
+        if tail:
+            yield tail
+
+def _read_header(f, file_hash):
+    """Returns (codec, kind, header_bytes); codec is None for legacy raw copies."""
+    header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        return None, KIND_FULL, header
+    codec = CODECS_BY_ID.get(header[len(MAGIC)])
+    if codec is None:
+        raise ValueError(f"Unknown vault codec id {header[len(MAGIC)]} in object {file_hash}")
+    return codec, header[len(MAGIC) + 1], header
+
+def _iter_content(vault_dir, file_hash, load_base):
+    """Yields an object's content in chunks; a delta is applied to `load_base(base_hash)`."""
+    with _open_object(vault_dir, file_hash) as f:
+        codec, kind, header = _read_header(f, file_hash)
+        if codec is None:
+            # Legacy uncompressed copy
+            yield header
+            yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+        elif kind == KIND_DELTA:
+            base_hash, _, ops = _decode_delta(b"".join(_iter_decompressed(f, codec)))
+            yield apply_delta(load_base(base_hash), ops)
+        else:
+            yield from _iter_decompressed(f, codec)
+
+def iter_object(vault_dir: str, file_hash: str):
+    """Yields the content of a vault object in chunks, resolving delta chains."""
+    yield from _iter_content(vault_dir, file_hash, lambda base_hash: read_object(vault_dir, base_hash))
+
+def read_object(vault_dir: str, file_hash: str) -> bytes:
+    return b"".join(iter_object(vault_dir, file_hash))
+
+def _delta_info(vault_dir, file_hash):
+    """Returns (base_hash, depth) for delta objects, (None, 0) for full ones.
+    Only decompresses as far as the delta header, not the whole patch."""
+    with _open_object(vault_dir, file_hash) as f:
+        codec, kind, _ = _read_header(f, file_hash)
+        if codec is None or kind != KIND_DELTA:
+            return None, 0
+        decompressor = codec.decompressor()
+        head = b""
+        for chunk in iter(lambda: f.read(DELTA_PEEK_SIZE), b""):
+            head += decompressor.decompress(chunk)
+            if len(head) >= DELTA_HEADER.size:
+                break
+        else:
+            flush = getattr(decompressor, "flush", None)
+            head += flush() if flush else b""
+        base_hash, depth, _ = DELTA_HEADER.unpack_from(head, 0)
+        return base_hash.decode("ascii"), depth
+
+def object_depth(vault_dir: str, file_hash: str) -> int:
+    """Number of deltas between this object and its nearest full snapshot."""
+    return _delta_info(vault_dir, file_hash)[1]
+
+def restore_object(vault_dir: str, file_hash: str, dest_path: str) -> bool:
+    """Streams an object back out to `dest_path`, replacing it atomically."""
+    if not has_object(vault_dir, file_hash):
+        return False
+
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".restore_", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            for chunk in iter_object(vault_dir, file_hash):
+                dst.write(chunk)
+        # Objects carry the original file's mtime
+        src = find_object(vault_dir, file_hash)
+        if src:
+            shutil.copystat(src, tmp_path)
+        else:
+            mtime_ns = _load_pack_index(vault_dir)[file_hash][3]
+            os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp_path, dest_path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# --- GARBAGE COLLECTION ---
+def _iter_loose(vault_dir):
+    for shard in os.listdir(vault_dir):
+        shard_dir = os.path.join(vault_dir, shard)
+        if not SHARD_RE.match(shard) or not os.path.isdir(shard_dir):
+            continue
+        for name in os.listdir(shard_dir):
+            if SHARDED_NAME_RE.match(name):
+                yield shard + name, os.path.join(shard_dir, name)
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _vault_size(vault_dir):
+    total = 0
+    for root, _, files in os.walk(vault_dir):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def _write_pack(vault_dir, entries):
+    """Writes [(hash, stored_bytes_loader, mtime_ns)] into a new pack; returns its .pack path."""
+    pack_dir = os.path.join(vault_dir, PACK_DIR)
+    os.makedirs(pack_dir, exist_ok=True)
+    pack_id = hashlib.sha256("".join(h for h, _, _ in entries).encode("ascii")).hexdigest()[:40]
+    pack_path = os.path.join(pack_dir, f"pack-{pack_id}.pack")
+    idx_path = os.path.join(pack_dir, f"pack-{pack_id}.idx")
+
+    index = {}
+    fd, tmp_pack = tempfile.mkstemp(dir=pack_dir, suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        for file_hash, load, mtime_ns in entries:
+            data = load()
+            index[file_hash] = [f.tell(), len(data), mtime_ns]
+            f.write(data)
+    os.replace(tmp_pack, pack_path)
+
+    fd, tmp_idx = tempfile.mkstemp(dir=pack_dir, suffix=".part")
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_idx, idx_path)  # The index lands last: a pack is only visible once complete
+    return pack_path
+
+def collect_garbage(vault_dir: str, roots) -> dict:
+    """Deletes objects unreachable from `roots` (following delta bases), then
+    consolidates small surviving objects into a single packfile."""
+    started = time.time()
+    size_before = _vault_size(vault_dir)
+    loose = dict(_iter_loose(vault_dir))
+    packed = dict(_load_pack_index(vault_dir))
+
+    # 1. Mark (recent loose objects count as roots: their history row may not exist yet)
+    stack = [h for h in roots if h]
+    stack += [h for h, path in loose.items() if started - os.stat(path).st_ctime < GC_GRACE_SECONDS]
+    reachable = set()
+    while stack:
+        file_hash = stack.pop()
+        if file_hash in reachable or (file_hash not in loose and file_hash not in packed):
+            continue
+        reachable.add(file_hash)
+        base_hash, _ = _delta_info(vault_dir, file_hash)
+        if base_hash:
+            stack.append(base_hash)
+
+    # 2. Repack: every surviving packed object plus small reachable loose ones
+    to_pack = []
+    for file_hash in sorted(reachable):
+        if file_hash in loose:
+            path = loose[file_hash]
+            st = os.stat(path)
+            if st.st_size <= PACK_MAX_OBJECT:
+                to_pack.append((file_hash, lambda p=path: _read_file(p), st.st_mtime_ns))
+        else:
+            entry = packed[file_hash]
+            to_pack.append((file_hash, lambda e=entry: _read_packed(e), entry[3]))
+
+    new_pack = _write_pack(vault_dir, to_pack) if to_pack else None
+    _invalidate_pack_index(vault_dir)  # Old and new packs both listed until the sweep
+
+    # 3. Sweep: old packs, packed loose copies, and unreachable loose objects
+    old_packs = {entry[0] for entry in packed.values()}
+    for pack_path in old_packs - {new_pack}:
+        for path in (pack_path[:-5] + ".idx", pack_path):
+            if os.path.exists(path):
+                os.remove(path)
+    _invalidate_pack_index(vault_dir)
+    packed_now = {h for h, _, _ in to_pack}
+    removed = 0
+    for file_hash, path in loose.items():
+        if file_hash in reachable and file_hash not in packed_now:
+            continue
+        if file_hash not in reachable:
+            removed += 1
+        os.remove(path)
+        try:
+            os.rmdir(os.path.dirname(path))  # Drop the shard once it is empty
+        except OSError:
+            pass
+    removed += len([h for h in packed if h not in reachable])
+
+    # Leftovers from interrupted writes
+    for root in (vault_dir, os.path.join(vault_dir, PACK_DIR)):
+        if not os.path.isdir(root):
+            continue
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if name.endswith(".part") and started - os.stat(path).st_mtime > GC_GRACE_SECONDS:
+                os.remove(path)
+
+    return {
+        "removed": removed,
+        "packed": len(to_pack),
+        "reclaimed_bytes": size_before - _vault_size(vault_dir)
+    }
+
+# --- INTEGRITY CHECK ---
+def _verify_tree(args):
+    """Process-pool job: re-hashes a root object and every delta built on it. Each object is
+    read and decompressed once; a delta is applied to its parent's content from this same
+    walk instead of rebuilding the chain. Returns [(hash, ok)]."""
+    vault_dir, root, children = args
+    results = []
+
+    def walk(file_hash, base):
+        kids = children.get(file_hash, ())
+        content = None
+        try:
+            sha256_hash = hashlib.sha256()
+            parts = []
+            # A delta whose parent is missing or unreadable gets base=None and fails here
+            for chunk in _iter_content(vault_dir, file_hash, lambda _: base):
+                sha256_hash.update(chunk)
+                if kids:
+                    parts.append(chunk)
+            ok = sha256_hash.hexdigest() == file_hash
+            if kids:
+                content = b"".join(parts)
+        except Exception:
+            ok = False
+        results.append((file_hash, ok))
+        for kid in kids:
+            walk(kid, content)
+
+    walk(root, None)
+    return results
+
+def verify_vault(vault_dir: str, referenced, max_workers: int = None) -> dict:
+    """Re-hashes every object in parallel and reports missing, corrupt and orphaned objects.
+    One job per delta tree (a full object plus the deltas built on it), so every object
+    is decompressed once; large trees are scheduled first so the pool drains evenly."""
+    sizes = {h: os.path.getsize(path) for h, path in _iter_loose(vault_dir)}
+    for file_hash, entry in _load_pack_index(vault_dir).items():
+        sizes.setdefault(file_hash, entry[2])
+
+    bases = {}
+    for file_hash in sizes:
+        try:
+            bases[file_hash] = _delta_info(vault_dir, file_hash)[0]
+        except Exception:
+            bases[file_hash] = None  # Unreadable header: verified alone and reported corrupt
+    children = {}
+    for file_hash, base in bases.items():
+        if base in sizes and base != file_hash:
+            children.setdefault(base, []).append(file_hash)
+
+    # Trees from every root; anything unreached sits on a base cycle and is checked alone
+    trees, seen = [], set()
+    roots = [h for h in sizes if bases[h] not in sizes or bases[h] == h]
+    for root in roots + sorted(sizes):
+        if root in seen:
+            continue
+        # Only edges the walk actually takes, so each job gets an acyclic tree
+        tree_children, weight, stack = {}, 0, [(None, root)]
+        while stack:
+            parent, file_hash = stack.pop()
+            if file_hash in seen:
+                continue
+            seen.add(file_hash)
+            weight += sizes[file_hash]
+            if parent is not None:
+                tree_children.setdefault(parent, []).append(file_hash)
+            stack.extend((file_hash, kid) for kid in children.get(file_hash, ()))
+        trees.append((weight, (vault_dir, root, tree_children)))
+    jobs = [job for _, job in sorted(trees, key=lambda t: t[0], reverse=True)]
+
+    results = []
+    if jobs:
+        workers = max_workers or os.cpu_count() or 1
+        # Spawn, not fork: fsck is started from a worker thread of the multi-threaded app
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=multiprocessing.get_context("spawn")) as pool:
+            for tree_results in pool.map(_verify_tree, jobs, chunksize=max(1, len(jobs) // (workers * 8))):
+                results.extend(tree_results)
+
+    corrupt = sorted(h for h, ok in results if not ok)
+
+    # Reachability: referenced hashes plus their delta bases
+    reachable = set()
+    stack = [h for h in referenced if h in sizes]
+    while stack:
+        file_hash = stack.pop()
+        if file_hash in reachable:
+            continue
+        reachable.add(file_hash)
+        if bases.get(file_hash):
+            stack.append(bases[file_hash])
+
+    return {
+        "checked": len(results),
+        "bytes": sum(sizes.values()),
+        "missing": sorted(h for h in set(referenced) if h and h not in sizes),
+        "corrupt": corrupt,
+        "orphaned": sorted(h for h in sizes if h not in reachable)
+    }
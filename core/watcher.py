@@ -1,54 +1,201 @@
 import os
+import re
+import fnmatch
+import heapq
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from state_manager import state
 
+DEFAULT_INCLUDE = ["*.csv", "*.xlsx"]
+
+def _compile_globs(patterns):
+    """Folds a glob list into one case-insensitive regex (None matches nothing)."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), re.IGNORECASE)
+
+class ExperimentFilter:
+    """Include/exclude globs compiled once. Includes are matched against the file name;
+    excludes against the file name and every folder below the watched root."""
+    def __init__(self, root, include=None, exclude=None):
+        self.root = os.path.abspath(root)
+        self.include = _compile_globs(include or DEFAULT_INCLUDE)
+        self.exclude = _compile_globs(exclude)
+
+    def excludes_dir(self, name):
+        return bool(self.exclude and self.exclude.match(name))
+
+    def matches(self, path):
+        name = os.path.basename(path)
+        if not self.include.match(name):
+            return False
+        if self.exclude:
+            rel = os.path.relpath(os.path.abspath(path), self.root)
+            if any(self.exclude.match(part) for part in rel.split(os.sep)):
+                return False
+        return True
+
+class DebounceScheduler:
+    """One thread for all debouncing: keeps a heap of per-path deadlines and fires
+    `callback(paths)` with every path that has been quiet for `interval` seconds."""
+    def __init__(self, interval, callback, batch_window=0.25):
+        self.interval = interval
+        self.callback = callback
+        self.batch_window = batch_window  # Paths due this close together flush as one batch
+        self.deadlines = {}  # {path: latest deadline}; older heap entries are stale
+        self.heap = []       # [(deadline, path)]
+        self.cond = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def touch(self, path):
+        """(Re)starts the quiet period for `path`."""
+        deadline = time.monotonic() + self.interval
+        with self.cond:
+            self.deadlines[path] = deadline
+            heapq.heappush(self.heap, (deadline, path))
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.heap:
+                    self.cond.wait()
+                if not self.running:
+                    return
+
+                now = time.monotonic()
+                due = []
+                while self.heap and self.heap[0][0] <= now + (self.batch_window if due else 0):
+                    deadline, path = heapq.heappop(self.heap)
+                    if self.deadlines.get(path) == deadline:
+                        del self.deadlines[path]
+                        due.append(path)
+                if not due:
+                    if self.heap:
+                        self.cond.wait(timeout=self.heap[0][0] - now)
+                    continue
+            # Outside the lock so handlers never block new events
+            self.callback(due)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
 class ExperimentHandler(FileSystemEventHandler):
-    def __init__(self, event_queue):
+    def __init__(self, event_queue, file_filter):
         self.queue = event_queue
-        self.timers = {}  # Store active timers: {path: Timer}
+        self.file_filter = file_filter
         self.debounce_interval = 2.0  # Wait 2 seconds after LAST write
         self.marker_file = ".restore_in_progress"
+        self.scheduler = DebounceScheduler(self.debounce_interval, self._trigger_events)
 
     def on_created(self, event):
         """Added to catch files immediately when they are dropped/pasted."""
         if not event.is_directory:
             self.on_modified(event)
 
+    def on_moved(self, event):
+        """Writers that save to a temp name and rename it into place only show up here."""
+        if not event.is_directory:
+            self._schedule(event.dest_path)
+
     def on_modified(self, event):
-        if event.is_directory or not (event.src_path.endswith('.csv') or event.src_path.endswith('.xlsx')):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+
+    def _schedule(self, path):
+        if not self.file_filter.matches(path):
             return
         # 1. Check for the "Restore" marker in the parent directory
         # This prevents the app from auto-committing when YOU restore an old version
-        marker_path = os.path.join(os.path.dirname(event.src_path), self.marker_file)
+        marker_path = os.path.join(os.path.dirname(path), self.marker_file)
         if os.path.exists(marker_path):
-            return 
-        # 2. Advanced Debouncing (Reset timer on every event)
-        # If a timer already exists for this file, cancel it (user is still writing)
-        if event.src_path in self.timers:
-            self.timers[event.src_path].cancel()
-        # Start a new timer
-        timer = threading.Timer(self.debounce_interval, self._trigger_event, args=[event.src_path])
-        self.timers[event.src_path] = timer
-        timer.start()
-
-    def _trigger_event(self, path):
-        """Called only when the file has been silent for `debounce_interval`."""
-        # Clean up timer reference
-        if path in self.timers:
-            del self.timers[path]
-        
-        # Verify file still exists (it might have been deleted during the delay)
-        if os.path.exists(path):
-            self.queue.put({"type": "NEW_FILE", "path": path})
-
-def start_watcher(path_to_watch, event_queue):
+            return
+        # 2. Debouncing: every event pushes the file's deadline back (user is still writing)
+        self.scheduler.touch(path)
+
+    def _trigger_events(self, paths):
+        """Called with every file that has been silent for `debounce_interval`."""
+        # Verify files still exist (they might have been deleted during the delay)
+        paths = [p for p in paths if os.path.exists(p)]
+        if paths:
+            self.queue.put({"type": "NEW_FILE", "paths": paths})
+
+class ExperimentObserver(Observer):
+    """Observer that also shuts down the handler's debounce thread."""
+    def __init__(self, event_handler):
+        super().__init__()
+        self.event_handler = event_handler
+
+    def stop(self):
+        super().stop()
+        self.event_handler.scheduler.stop()
+
+def _scan_files(path_to_scan, file_filter, recursive):
+    """Yields DirEntry objects for matching files, pruning excluded folders."""
+    pending = [path_to_scan]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not file_filter.excludes_dir(entry.name):
+                        pending.append(entry.path)
+                elif entry.is_file() and file_filter.matches(entry.path):
+                    yield entry
+
+def list_experiment_files(folder, settings=None):
+    """Every file under `folder` the watcher settings would ingest, sorted."""
+    settings = settings or {}
+    file_filter = ExperimentFilter(folder, settings.get("include"), settings.get("exclude"))
+    return sorted(entry.path for entry in _scan_files(folder, file_filter, settings.get("recursive", False)))
+
+def reconcile_directory(path_to_scan, manifest, known_paths, hash_func, settings=None, max_workers=8):
+    """Diffs the directory against the manifest (files dropped in while the app was closed).
+    Files whose size and mtime match the manifest are skipped without reading; the rest
+    are hashed in parallel. Returns (paths_to_ingest, manifest_updates)."""
+    if not os.path.isdir(path_to_scan):
+        return [], []
+
+    settings = settings or {}
+    file_filter = ExperimentFilter(path_to_scan, settings.get("include"), settings.get("exclude"))
+    candidates = []
+    for entry in _scan_files(path_to_scan, file_filter, settings.get("recursive", False)):
+        st = entry.stat()
+        known = manifest.get(entry.path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            continue
+        candidates.append((entry.path, st))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:  # hashlib releases the GIL
+        hashes = list(pool.map(lambda c: hash_func(c[0]), candidates))
+
+    to_ingest, updates = [], []
+    for (path, st), file_hash in zip(candidates, hashes):
+        if not file_hash:
+            continue
+        known = manifest.get(path)
+        if known and known[2] == file_hash:
+            updates.append((path, st.st_size, st.st_mtime_ns, file_hash))  # Touched, not changed
+        elif not known and path in known_paths:
+            updates.append((path, st.st_size, st.st_mtime_ns, file_hash))  # Committed before manifests existed
+        else:
+            to_ingest.append(path)
+    return sorted(to_ingest), updates
+
+def start_watcher(path_to_watch, event_queue, settings=None):
     if not os.path.exists(path_to_watch):
         os.makedirs(path_to_watch)
-        
-    event_handler = ExperimentHandler(event_queue)
-    observer = Observer()
-    observer.schedule(event_handler, path_to_watch, recursive=False)
+
+    settings = settings or {}
+    file_filter = ExperimentFilter(path_to_watch, settings.get("include"), settings.get("exclude"))
+    event_handler = ExperimentHandler(event_queue, file_filter)
+    observer = ExperimentObserver(event_handler)
+    observer.schedule(event_handler, path_to_watch, recursive=settings.get("recursive", False))
     observer.start()
-    return observer
\ No newline at end of file
+    return observer
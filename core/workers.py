@@ -2,20 +2,111 @@
 import pygame
 import os
 import json
+import hashlib
 import pandas as pd
 import threading
 import shutil
 from queue import Queue
 from state_manager import state
-from engine.analytics import create_seaborn_surface, HeaderScanner
-from core.hashing import save_to_vault, get_file_hash, ensure_vault
+from engine.analytics import HeaderScanner, build_native_context, attach_series
+from engine.render_pool import render_surface
+from engine.plot_cache import PlotCache, plot_key, PLOT_CACHE_DIRNAME
+from core.config import cfg
+from core.frame_cache import read_frame
+from core.hashing import save_to_vault, get_file_hash, ensure_vault, remember_file_hash, get_hash_cache
+from core import vault
+from core.watcher import reconcile_directory
+from core.ingest import run_pipeline, profile_frame, profile_numeric_columns
+from core.schema import get_schema, numeric_columns
+from core.preview import get_preview, PREVIEW_MIN_BYTES
 
 class WorkerController:
-    def __init__(self, db, ai_engine):
+    def __init__(self, db, ai_engine, project_path=None):
         self.db = db
         self.ai_engine = ai_engine
+        self.project_path = project_path
+        self.plot_cache = PlotCache(cfg.data.get("plot_cache_mb", 64) * 1024 * 1024)
 
-    def worker_load_experiment(self, exp_ids, custom_x=None, custom_y=None, save_settings=False):
+    def _plot(self, df1, df2=None, x_col=None, y_col=None, file_path=None):
+        """Plot data for the UI. In "native" plot mode the panel draws from min/max pyramids
+        and no bitmap is rendered (except side-by-side comparisons, which need one)."""
+        if cfg.data.get("plot_mode", "fast") == "native":
+            context = build_native_context(df1, df2, x_col, y_col)
+            if context:
+                return None, (400, 300), context
+            return render_surface(df1, df2, x_col=x_col, y_col=y_col, mode="fast")
+        if file_path and df2 is None:
+            return self._cached_render(df1, file_path, x_col=x_col, y_col=y_col)
+        return render_surface(df1, df2, x_col=x_col, y_col=y_col)
+
+    def _plot_cache_slot(self, file_hash, x_col, y_col):
+        """(cache_dir, key) of a single-file bitmap render with the current theme and mode."""
+        cache_dir = os.path.join(ensure_vault(self.project_path), PLOT_CACHE_DIRNAME)
+        key = plot_key(file_hash, x_col, y_col, cfg.data.get("theme", "LIGHT"), (400, 300), cfg.data.get("plot_mode", "fast"))
+        return cache_dir, key
+
+    def _cached_render(self, df, file_path, x_col=None, y_col=None):
+        """render_surface for a single file, served from the plot cache when the content is unchanged."""
+        file_hash = get_file_hash(file_path, self.project_path) if self.project_path else None
+        if not file_hash:
+            return render_surface(df, x_col=x_col, y_col=y_col)
+
+        cache_dir, key = self._plot_cache_slot(file_hash, x_col, y_col)
+        hit = self.plot_cache.get(cache_dir, key)
+        if hit:
+            raw, size, meta = hit
+            return raw, size, attach_series({**meta, "df": df}, df)
+
+        plot_bytes, size, context = render_surface(df, x_col=x_col, y_col=y_col)
+        if plot_bytes is not None:
+            self.plot_cache.put(cache_dir, key, plot_bytes, size, context)
+        return plot_bytes, size, context
+
+    def _read_plot_frame(self, file_path, file_hash, schema, x_col, y_col, cancel_token=None):
+        """The frame a single-file plot draws from: the whole-file preview for large files,
+        else a typed read of just the two axes. Returns (df, preview_info or None)."""
+        if os.path.getsize(file_path) > PREVIEW_MIN_BYTES:
+            # One-pass sample + per-chunk extremes, shared by every axis choice
+            df, info = get_preview(file_path, file_hash, schema, ensure_vault(self.project_path), cancel_token)
+            if df is not None or (cancel_token and cancel_token.cancelled):
+                return df, info
+        return read_frame(file_path, columns=list(dict.fromkeys([x_col, y_col])), schema=schema), None
+
+    def worker_load_series(self, context, file_path, file_hash, schema, x_col, y_col, cancel_token=None):
+        """Tooltip arrays for a plot that was served from the cache without reading the file."""
+        try:
+            df, _ = self._read_plot_frame(file_path, file_hash, schema, x_col, y_col, cancel_token)
+            if df is None or (cancel_token and cancel_token.cancelled):
+                return {"type": "CANCELLED"}
+            return {"type": "SERIES_READY", "data": {"context": context, "series": attach_series({"series_cols": context.get("series_cols", {})}, df)["series"]}}
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def _column_profile(self, file_path, df=None):
+        """Stored column profile for the file's current content, computed and stored on first use."""
+        file_hash = get_file_hash(file_path, self.project_path) if self.project_path else None
+        profile = self.db.get_profile(file_hash)
+        if profile is None:
+            profile = profile_frame(df if df is not None else read_frame(file_path))
+            if file_hash:
+                self.db.save_profiles([(file_hash, profile)])
+        return profile
+
+    def _record_manifest(self, file_path, file_hash=None):
+        """Marks the file's current content as seen so the startup scan skips it.
+        Pass `file_hash` when the caller just wrote the bytes, so they are not read back."""
+        try:
+            st = os.stat(file_path)
+            if file_hash:
+                remember_file_hash(file_path, file_hash, self.project_path)
+            else:
+                file_hash = get_file_hash(file_path, self.project_path)
+            if file_hash:
+                self.db.update_manifest([(file_path, st.st_size, st.st_mtime_ns, file_hash)])
+        except OSError:
+            pass
+
+    def worker_load_experiment(self, exp_ids, custom_x=None, custom_y=None, save_settings=False, cancel_token=None):
         try:
             if len(exp_ids) == 1:
                 raw = self.db.get_experiment_by_id(exp_ids[0])
@@ -39,31 +130,66 @@ class WorkerController:
                     if save_settings and final_x and final_y: 
                         self.db.update_plot_settings(exp_ids[0], final_x, final_y)
 
-                    file_size = os.path.getsize(file_path)
-                    if file_size > 50 * 1024 * 1024: # 50MB
-                        df = pd.read_csv(file_path, nrows=1000)
-                        status_note = "LARGE FILE: PREVIEW MODE (FIRST 1000 ROWS)"
+                    # Parse only the plotted axes (typed, full range) once the schema is known
+                    file_hash = get_file_hash(file_path, self.project_path) if self.project_path else None
+                    schema = get_schema(file_path, file_hash, self.project_path) if file_hash else None
+                    profile = self.db.get_profile(file_hash)
+                    numeric_cols = profile_numeric_columns(profile) if profile else (numeric_columns(schema) if schema else None)
+                    status_note = f"LOADED: {raw[2]}"
+                    result_data = {
+                        "analysis": json.loads(raw[4]),
+                        "metadata": {"notes": raw[8], "temp": raw[9], "sid": raw[10]}
+                    }
+                    if numeric_cols and len(numeric_cols) >= 2:
+                        final_x = final_x if final_x in numeric_cols else numeric_cols[0]
+                        final_y = final_y if final_y in numeric_cols else numeric_cols[1]
+
+                        # The axes are known without parsing, so a cached render needs no read at all;
+                        # the tooltip arrays follow from a separate task
+                        if file_hash and cfg.data.get("plot_mode", "fast") != "native":
+                            hit = self.plot_cache.get(*self._plot_cache_slot(file_hash, final_x, final_y))
+                            if hit:
+                                plot_bytes, size, meta = hit
+                                context = {**meta, "numeric_cols": numeric_cols}
+                                return {
+                                    "type": "LOAD_COMPLETE",
+                                    "data": {
+                                        **result_data,
+                                        "plot_data": (plot_bytes, size, context),
+                                        "status": status_note,
+                                        "follow_ups": [{
+                                            "func": self.worker_load_series,
+                                            "args": [context, file_path, file_hash, schema, final_x, final_y],
+                                            "key": "plot"
+                                        }]
+                                    }
+                                }
+
+                        df, info = self._read_plot_frame(file_path, file_hash, schema, final_x, final_y, cancel_token)
+                        if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
+                        if info:
+                            status_note = f"LARGE FILE: WHOLE-FILE PREVIEW ({info['shown']:,} OF {info['rows']:,} ROWS)"
                     else:
-                        df = pd.read_csv(file_path)
-                        status_note = f"LOADED: {raw[2]}"
+                        df = read_frame(file_path)
 
-                    plot_bytes, size, context = create_seaborn_surface(df, x_col=final_x, y_col=final_y)
+                    # A newer load for this view may have arrived while reading
+                    if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
+                    plot_bytes, size, context = self._plot(df, x_col=final_x, y_col=final_y, file_path=file_path)
+                    if context is not None and numeric_cols:
+                        context["numeric_cols"] = numeric_cols  # The frame may hold only the plotted axes
                     
                     return {
                         "type": "LOAD_COMPLETE",
-                        "data": {
-                            "plot_data": (plot_bytes, size, context),
-                            "analysis": json.loads(raw[4]),
-                            "metadata": {"notes": raw[8], "temp": raw[9], "sid": raw[10]},
-                            "status": status_note
-                        }
+                        "data": {**result_data, "plot_data": (plot_bytes, size, context), "status": status_note}
                     }
             elif len(exp_ids) == 2:
                 raw1 = self.db.get_experiment_by_id(exp_ids[0])
                 raw2 = self.db.get_experiment_by_id(exp_ids[1])
                 if raw1 and raw2:
-                    df1 = pd.read_csv(raw1[3])
-                    df2 = pd.read_csv(raw2[3])
+                    df1 = read_frame(raw1[3])
+                    if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
+                    df2 = read_frame(raw2[3])
+                    if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
                     
                     u1, col1 = HeaderScanner.detect_temp_unit(df1)
                     u2, col2 = HeaderScanner.detect_temp_unit(df2)
@@ -71,41 +197,80 @@ class WorkerController:
                     if u1 and u2 and u1 != u2:
                         return {"type": "CONVERSION_NEEDED", "data": (raw2[3], col2, u1)}
                     
-                    plot_bytes, size, context = create_seaborn_surface(df1, df2, x_col=custom_x, y_col=custom_y)
-                    comparison = self.ai_engine.compare_experiments(df1, df2)
-                    
+                    plot_bytes, size, context = self._plot(df1, df2, x_col=custom_x, y_col=custom_y)
+                    if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
+                    profile1 = self._column_profile(raw1[3], df1)
+                    profile2 = self._column_profile(raw2[3], df2)
+                    if context is not None:
+                        numeric2 = set(profile_numeric_columns(profile2))
+                        context["numeric_cols"] = [c for c in profile_numeric_columns(profile1) if c in numeric2]
+
+                    # The comparison may be a model call: it follows on the AI lane, so the plot
+                    # shows now and the AI STOP button can drop it
                     return {
                         "type": "LOAD_COMPLETE",
                         "data": {
                             "plot_data": (plot_bytes, size, context),
-                            "analysis": comparison,
-                            "status": "COMPARISON COMPLETE"
+                            "analysis": {"summary": "COMPARING...", "anomalies": []},
+                            "status": "COMPARING...",
+                            "follow_ups": [{
+                                "func": self.worker_compare_experiments,
+                                "args": [list(exp_ids), df1, df2, profile1, profile2],
+                                "lane": "ai",
+                                "key": "compare"
+                            }]
                         }
                     }
             return {"type": "ERROR", "data": "Invalid Selection"}
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
 
+    def worker_compare_experiments(self, exp_ids, df1, df2, profile1, profile2, cancel_token=None):
+        """Parent vs child comparison for a two-node selection whose plot is already shown."""
+        try:
+            comparison = self.ai_engine.compare_experiments(df1, df2, profile1, profile2)
+            if cancel_token and cancel_token.cancelled:
+                return {"type": "CANCELLED"}
+            return {"type": "COMPARISON_READY", "data": {"ids": exp_ids, "analysis": comparison}}
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def _commit_file(self, file_path, parent_id, branch):
+        """Adds one file as a node. Returns (new_id, analysis), or (None, None) if already tracked."""
+        if self.db.get_id_by_path(file_path):
+            self._record_manifest(file_path)
+            return None, None
+
+        # --- PERFORMANCE FIX: Use Placeholder Analysis ---
+        # Don't run full AI here. Just get basic stats (profiled once, stored by content hash).
+        try:
+            profile = self._column_profile(file_path)
+        except Exception as e:
+            print(f"Profile Failed ({file_path}): {e}")
+            profile = None
+        analysis_data = self.ai_engine.get_placeholder_analysis(file_path, profile)
+
+        new_id = self.db.add_experiment(os.path.basename(file_path), file_path, analysis_data.model_dump(), parent_id, branch)
+        self._record_manifest(file_path)
+        return new_id, analysis_data.model_dump()
+
     def worker_process_new_file(self, file_path, parent_id, branch, researcher):
         try:
             existing_id = self.db.get_id_by_path(file_path)
             if existing_id:
+                self._record_manifest(file_path)
                 return self.worker_load_experiment([existing_id])
+
+            new_id, analysis = self._commit_file(file_path, parent_id, branch)
             
-            # --- PERFORMANCE FIX: Use Placeholder Analysis ---
-            # Don't run full AI here. Just get basic stats.
-            analysis_data = self.ai_engine.get_placeholder_analysis(file_path)
-            
-            new_id = self.db.add_experiment(os.path.basename(file_path), file_path, analysis_data.model_dump(), parent_id, branch)
-            
-            df = pd.read_csv(file_path)
-            plot_bytes, size, context = create_seaborn_surface(df)
+            df = read_frame(file_path)
+            plot_bytes, size, context = self._plot(df, file_path=file_path)
             
             return {
                 "type": "NEW_FILE_COMPLETE",
                 "data": {
                     "id": new_id,
-                    "analysis": analysis_data.model_dump(),
+                    "analysis": analysis,
                     "plot_data": (plot_bytes, size, context),
                     "status": f"COMMITTED BY {researcher}"
                 }
@@ -113,7 +278,56 @@ class WorkerController:
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
 
-    def worker_analyze_selection(self, node_id):
+    def worker_ingest_files(self, file_paths, parent_id, branch, researcher):
+        """Commits a watcher batch as one job; anything beyond a single file takes the bulk pipeline."""
+        if len(file_paths) == 1:
+            return self.worker_process_new_file(file_paths[0], parent_id, branch, researcher)
+        return self.worker_bulk_ingest(file_paths, parent_id, branch, researcher)
+
+    def worker_bulk_ingest(self, file_paths, parent_id, branch, researcher):
+        """Folder/batch import: parallel hash -> parallel parse -> one DB transaction.
+        Nothing is plotted here; the new head renders once selected."""
+        try:
+            known = self.db.get_all_paths()
+            new_paths = [p for p in dict.fromkeys(file_paths) if p not in known]
+
+            def report(stage, done, total, files_s, mb_s):
+                state.status_msg = f"INGEST {stage} {done}/{total} | {files_s:.1f} FILES/S | {mb_s:.1f} MB/S"
+
+            with get_hash_cache(self.project_path).batch():
+                hashed, parsed, (files_s, mb_s) = run_pipeline(
+                    list(dict.fromkeys(file_paths)),
+                    lambda path: get_file_hash(path, self.project_path),
+                    new_paths, on_progress=report
+                )
+
+            entries = []
+            for path in new_paths:
+                shape = parsed.get(path)
+                if shape is None:
+                    continue  # Vanished or unreadable before hashing
+                if "error" in shape:
+                    print(f"Ingest Parse Failed ({path}): {shape['error']}")
+                    analysis = self.ai_engine.placeholder_from_shape()
+                else:
+                    analysis = self.ai_engine.placeholder_from_shape(shape["rows"], shape["cols"])
+                entries.append((os.path.basename(path), path, analysis.model_dump()))
+
+            manifest = [(path, *info) for path, info in hashed.items()]
+            ids = self.db.add_experiments_bulk(entries, parent_id, branch, manifest)
+            self.db.save_profiles([(hashed[p][2], shape["profile"]) for p, shape in parsed.items() if "profile" in shape])
+
+            status = f"COMMITTED {len(ids)} FILES BY {researcher} ({files_s:.1f} FILES/S, {mb_s:.1f} MB/S)"
+            if not ids:
+                return {"type": "INGEST_COMPLETE", "data": status}
+            return {
+                "type": "BULK_INGEST_COMPLETE",
+                "data": {"id": ids[-1], "analysis": entries[-1][2], "status": status}
+            }
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def worker_analyze_selection(self, node_id, cancel_token=None):
         """Manually triggered AI analysis for a specific node using GPT-5-Mini."""
         try:
             raw = self.db.get_experiment_by_id(node_id)
@@ -123,13 +337,13 @@ class WorkerController:
             if not os.path.exists(file_path): return {"type": "ERROR", "data": "File missing"}
             
             # Check before AI call
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
             
             # Run the heavy AI analysis
-            analysis_data = self.ai_engine.analyze_csv_data(file_path, model="gpt-5-mini")
+            analysis_data = self.ai_engine.analyze_csv_data(file_path, model="gpt-5-mini", cancel_token=cancel_token)
             
             # Check after AI call (in case user clicked stop while waiting)
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
             
             # Update DB with new analysis
             with self.db.lock:
@@ -144,15 +358,15 @@ class WorkerController:
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
 
-    def worker_analyze_branch(self, branch_name):
+    def worker_analyze_branch(self, branch_name, cancel_token=None):
         try:
             tree = self.db.get_tree_data()
             branch_nodes = [row for row in tree if row[2] == branch_name]
             history_text = "\n".join([f"ID: {row[0]} | Name: {row[3]}" for row in branch_nodes[-5:]])
             
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
             report = self.ai_engine.analyze_branch_history(history_text)
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if cancel_token and cancel_token.cancelled: return {"type": "CANCELLED"}
             
             return {
                 "type": "ANALYSIS_READY",
@@ -163,7 +377,7 @@ class WorkerController:
 
     def worker_perform_conversion(self, file_path, column, to_unit, ids_to_reload):
         try:
-            df = pd.read_csv(file_path)
+            df = read_frame(file_path, copy=True)  # convert_column edits in place
             df = HeaderScanner.convert_column(df, column, to_unit)
             df.to_csv(file_path, index=False)
             return self.worker_load_experiment(ids_to_reload)
@@ -184,15 +398,20 @@ class WorkerController:
         """Saves editor changes with version control (hashing old version)."""
         try:
             # 1. Archive the current version on disk before overwriting
-            old_hash = save_to_vault(file_path, project_path)
+            #    (as a delta against the node's previous version where possible)
+            history = self.db.get_node_history(node_id)
+            old_hash = save_to_vault(file_path, project_path, base_hash=history[-1] if history else None)
             if old_hash:
                 self.db.add_hash_to_history(node_id, old_hash)
             
             # 2. Save the new data
-            df.to_csv(file_path, index=False)
+            data = df.to_csv(index=False).encode("utf-8")
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self._record_manifest(file_path, hashlib.sha256(data).hexdigest())
             
             # 3. Reload visualization
-            plot_bytes, size, context = create_seaborn_surface(df)
+            plot_bytes, size, context = self._plot(df)
             
             return {
                 "type": "SAVE_COMPLETE", 
@@ -214,16 +433,18 @@ class WorkerController:
             
             # The last item in history is the state *before* the current file state
             target_hash = history[-1]
-            vault_file = os.path.join(project_path, ".sci_vault", f"{target_hash}.csv")
+            vault_dir = ensure_vault(project_path)
             
-            if not os.path.exists(vault_file):
+            if not vault.has_object(vault_dir, target_hash):
                 return {"type": "ERROR", "data": "VERSION MISSING IN VAULT"}
 
             # 1. Save CURRENT state to Vault for Redo
-            current_hash = save_to_vault(file_path, project_path)
+            current_hash = save_to_vault(file_path, project_path, base_hash=target_hash)
             
-            # 2. Restore Old File
-            shutil.copy2(vault_file, file_path)
+            # 2. Restore Old File (decompressed as a stream)
+            vault.restore_object(vault_dir, target_hash, file_path)
+            remember_file_hash(file_path, target_hash, project_path)
+            self._record_manifest(file_path)
             
             # 3. Update DB (Remove used history) and return data for Redo Stack
             self.db.remove_last_history_entry(node_id)
@@ -241,17 +462,20 @@ class WorkerController:
 
     def worker_redo(self, node_id, file_path, project_path, redo_hash):
         try:
-            vault_file = os.path.join(project_path, ".sci_vault", f"{redo_hash}.csv")
-            if not os.path.exists(vault_file):
+            vault_dir = ensure_vault(project_path)
+            if not vault.has_object(vault_dir, redo_hash):
                  return {"type": "ERROR", "data": "REDO TARGET MISSING"}
             
             # 1. Save CURRENT state (which was the 'Undo' state) back to history
-            current_hash = save_to_vault(file_path, project_path)
+            history = self.db.get_node_history(node_id)
+            current_hash = save_to_vault(file_path, project_path, base_hash=history[-1] if history else redo_hash)
             if current_hash:
                 self.db.add_hash_to_history(node_id, current_hash)
                 
             # 2. Restore the Redo file
-            shutil.copy2(vault_file, file_path)
+            vault.restore_object(vault_dir, redo_hash, file_path)
+            remember_file_hash(file_path, redo_hash, project_path)
+            self._record_manifest(file_path)
             
             return {
                 "type": "REDO_COMPLETE",
@@ -260,66 +484,210 @@ class WorkerController:
         except Exception as e:
              return {"type": "ERROR", "data": str(e)}
 
-class TaskQueue:
+    def worker_reconcile_data_dir(self, data_dir, event_queue, watcher_settings=None):
+        """Startup scan: queues only files that are new or changed since the manifest was written."""
+        try:
+            with get_hash_cache(self.project_path).batch():
+                to_ingest, updates = reconcile_directory(
+                    data_dir, self.db.get_manifest(), self.db.get_all_paths(),
+                    lambda path: get_file_hash(path, self.project_path),
+                    settings=watcher_settings, max_workers=min(8, os.cpu_count() or 1)
+                )
+            self.db.update_manifest(updates)
+            if to_ingest:
+                event_queue.put({"type": "NEW_FILE", "paths": to_ingest})
+            return {"type": "RECONCILE_COMPLETE", "data": f"STARTUP SCAN: {len(to_ingest)} NEW/CHANGED FILES"}
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def worker_vault_gc(self, project_path, extra_roots):
+        """Drops vault objects no history references and packs the small survivors."""
+        try:
+            roots = set(self.db.get_referenced_hashes()) | set(extra_roots)
+            stats = vault.collect_garbage(ensure_vault(project_path), roots)
+            mb = max(0, stats["reclaimed_bytes"]) / (1024 * 1024)
+            return {
+                "type": "GC_COMPLETE",
+                "data": f"VAULT GC: {stats['removed']} REMOVED, {stats['packed']} PACKED, {mb:.1f} MB RECLAIMED"
+            }
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def worker_vault_fsck(self, project_path, extra_roots):
+        """Re-hashes every vault object in a process pool and reports damage."""
+        try:
+            referenced = set(self.db.get_referenced_hashes()) | set(extra_roots)
+            report = vault.verify_vault(ensure_vault(project_path), referenced)
+            for label in ("missing", "corrupt", "orphaned"):
+                for file_hash in report[label]:
+                    print(f"Vault Check: {label.upper()} {file_hash}")
+            return {
+                "type": "FSCK_COMPLETE",
+                "data": (f"VAULT CHECK: {report['checked']} OBJECTS, {len(report['missing'])} MISSING, "
+                         f"{len(report['corrupt'])} CORRUPT, {len(report['orphaned'])} ORPHANED")
+            }
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+class CancelToken:
+    """Per-task cancellation flag. Workers poll it at safe points; a cancelled task's result is dropped."""
     def __init__(self):
-        self.task_queue = Queue()
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+# Worker threads per lane. "io" stays single so saves, undo/redo, ingest and GC
+# hit the vault and DB in submission order; AI calls are network-bound.
+DEFAULT_LANES = {"interactive": 2, "io": 1, "ai": 2}
+
+class TaskQueue:
+    def __init__(self, lanes=None):
+        self.lanes = {**DEFAULT_LANES, **(lanes or {})}
+        self.task_queues = {lane: Queue() for lane in self.lanes}
         self.result_queue = Queue()
-        self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self.worker_thread.start()
+        self.in_flight = {}  # {task_id: (lane, token)}; only touched on the main thread
+        self.keyed = {}      # {key: token of the newest task for that key}
+        self.next_task_id = 0
+        self.worker_threads = []
+        for lane, count in self.lanes.items():
+            for _ in range(max(1, int(count))):
+                t = threading.Thread(target=self._worker_loop, args=(lane,), daemon=True)
+                t.start()
+                self.worker_threads.append(t)
 
-    def _worker_loop(self):
+    def _worker_loop(self, lane):
+        task_queue = self.task_queues[lane]
         while True:
-            func, args = self.task_queue.get()
+            task_id, func, args, kwargs, token = task_queue.get()
             try:
-                result = func(*args)
-                self.result_queue.put(result)
+                if token.cancelled:
+                    result = {"type": "CANCELLED"}
+                else:
+                    result = func(*args, **kwargs)
+                self.result_queue.put((task_id, result))
             except Exception as e:
-                self.result_queue.put({"type": "ERROR", "data": str(e)})
+                self.result_queue.put((task_id, {"type": "ERROR", "data": str(e)}))
             finally:
-                self.task_queue.task_done()
+                task_queue.task_done()
 
-    def add_task(self, func, args):
+    def add_task(self, func, args, lane="interactive", token=None, key=None):
+        """Queues `func(*args)` on a lane. Pass the same `token` inside `args` for cooperative checks.
+        Keyed tasks are latest-wins: a new task cancels the queued/running one with the same key,
+        and receives its own token as the `cancel_token` keyword."""
+        token = token or CancelToken()
+        kwargs = {}
+        if key is not None:
+            previous = self.keyed.get(key)
+            if previous:
+                previous.cancel()
+            self.keyed[key] = token
+            kwargs["cancel_token"] = token
+        task_id = self.next_task_id
+        self.next_task_id += 1
+        self.in_flight[task_id] = (lane, token)
         state.is_processing = True
-        self.task_queue.put((func, args))
+        self.task_queues[lane].put((task_id, func, args, kwargs, token))
+        return token
+
+    def cancel(self, token):
+        token.cancel()
+        self._refresh_state()
+
+    def _add_follow_up(self, func, args, lane="interactive", key=None):
+        """Queues a task a result asked for. An AI-lane one gets its own token, which
+        becomes what the AI STOP button aborts."""
+        token = None
+        if lane == "ai":
+            token = state.ai_cancel_token = CancelToken()
+        self.add_task(func, args, lane=lane, token=token, key=key)
+        if lane == "ai":
+            state.processing_mode = "AI"
+
+    def busy(self, lane=None):
+        """True while a live (non-cancelled) task is queued or running, optionally on one lane."""
+        return any(not token.cancelled and (lane is None or l == lane) for l, token in self.in_flight.values())
+
+    def _refresh_state(self):
+        state.is_processing = self.busy()
+        if not state.is_processing:
+            state.processing_mode = "NORMAL"
+        elif self.busy("ai"):
+            state.processing_mode = "AI"
+        elif state.processing_mode == "AI":
+            state.processing_mode = "LOCAL"
+
+    @staticmethod
+    def _show_plot(plot_data):
+        """Bitmap renders become a Surface; native contexts are drawn by the plot widget."""
+        raw, size, ctx = plot_data
+        if ctx is None:
+            return
+        state.current_plot = pygame.image.frombuffer(raw, size, "RGBA") if raw else None
+        state.plot_context = ctx
 
     def process_results(self):
         while not self.result_queue.empty():
-            result = self.result_queue.get()
-            
-            if result.get("type") == "CANCELLED":
-                # Silently ignore cancelled tasks
+            task_id, result = self.result_queue.get()
+            _, token = self.in_flight.pop(task_id, (None, None))
+            for key in [k for k, t in self.keyed.items() if t is token]:
+                del self.keyed[key]
+
+            if result.get("type") == "CANCELLED" or (token and token.cancelled):
+                # Silently ignore cancelled and superseded tasks
+                self._refresh_state()
                 continue
 
             if result.get("type") == "ERROR":
                 state.status_msg = f"ERROR: {result['data']}"
-                state.is_processing = False
-                state.processing_mode = "NORMAL"
+                self._refresh_state()
                 continue
 
             msg_type = result.get("type")
             data = result.get("data")
 
             # Common reset for all success types
-            state.is_processing = False
-            state.processing_mode = "NORMAL"
+            self._refresh_state()
 
             if msg_type == "LOAD_COMPLETE":
-                if 'plot_data' in data and data['plot_data'][0]:
-                    raw, size, ctx = data['plot_data']
-                    state.current_plot = pygame.image.frombuffer(raw, size, "RGBA")
-                    state.plot_context = ctx
+                if 'plot_data' in data: self._show_plot(data['plot_data'])
                 if 'analysis' in data: state.current_analysis = data['analysis']
                 if 'metadata' in data:
                     state.meta_input_notes = data['metadata'].get('notes', "") or ""
                 if 'status' in data: state.status_msg = data['status']
+                for follow_up in data.get('follow_ups', ()):
+                    self._add_follow_up(**follow_up)
+
+            elif msg_type == "COMPARISON_READY":
+                # Only if the same pair is still selected
+                if list(state.selected_ids) == data['ids']:
+                    state.current_analysis = data['analysis']
+                    state.status_msg = "COMPARISON COMPLETE"
+
+            elif msg_type == "SERIES_READY":
+                # Only if that plot is still the one on screen
+                if state.plot_context is data['context']:
+                    state.plot_context["series"] = data['series']
 
             elif msg_type == "NEW_FILE_COMPLETE":
                 state.head_id = data['id']
                 state.selected_ids = [data['id']]
                 state.current_analysis = data['analysis']
-                raw, size, ctx = data['plot_data']
-                state.current_plot = pygame.image.frombuffer(raw, size, "RGBA")
-                state.plot_context = ctx
+                self._show_plot(data['plot_data'])
+                state.needs_tree_update = True
+                state.status_msg = data['status']
+
+            elif msg_type == "BULK_INGEST_COMPLETE":
+                state.head_id = data['id']
+                state.selected_ids = [data['id']]
+                state.current_analysis = data['analysis']
+                # Plots were skipped during ingest; a node renders when it is selected
+                state.current_plot = None
+                state.plot_context = None
                 state.needs_tree_update = True
                 state.status_msg = data['status']
 
@@ -334,17 +702,14 @@ class TaskQueue:
                 state.ai_popup_scroll_y = 0   # Reset Scroll
                 state.status_msg = "ANALYSIS COMPLETE"
             
-            elif msg_type == "EXPORT_COMPLETE":
+            elif msg_type in ("EXPORT_COMPLETE", "GC_COMPLETE", "FSCK_COMPLETE", "RECONCILE_COMPLETE", "INGEST_COMPLETE"):
                 state.status_msg = data
 
             elif msg_type == "SAVE_COMPLETE":
                 if 'node_id' in data:
                     state.redo_stack[data['node_id']] = [] 
                 state.status_msg = "VERSION SAVED."
-                if 'plot_data' in data and data['plot_data'][0]:
-                    raw, size, ctx = data['plot_data']
-                    state.current_plot = pygame.image.frombuffer(raw, size, "RGBA")
-                    state.plot_context = ctx
+                if 'plot_data' in data: self._show_plot(data['plot_data'])
 
             elif msg_type == "UNDO_COMPLETE":
                 node_id = data['node_id']
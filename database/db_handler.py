@@ -13,6 +13,8 @@ class DBHandler:
 
     def create_tables(self):
         self.conn.execute("CREATE TABLE IF NOT EXISTS node_history (node_id INTEGER, file_hash TEXT, timestamp DATETIME)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS file_manifest (file_path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, file_hash TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS column_profiles (file_hash TEXT PRIMARY KEY, profile_json TEXT)")
         query = """
         CREATE TABLE IF NOT EXISTS experiments (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -158,6 +160,85 @@ class DBHandler:
             """
             cursor.execute(query, (node_id,))
             self.conn.commit()
+
+    def add_experiments_bulk(self, entries, parent_id=None, branch="main", manifest_entries=()):
+        """Inserts [(name, file_path, analysis_dict)] in ONE transaction, each node chained onto
+        the previous one, together with their manifest rows. Returns the ids in order."""
+        query = """
+        INSERT INTO experiments (timestamp, name, file_path, analysis_json, parent_id, branch_name)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        ids = []
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                for name, file_path, analysis_dict in entries:
+                    try:
+                        cursor.execute(query, (timestamp, name, file_path, json.dumps(analysis_dict), parent_id, branch))
+                        parent_id = cursor.lastrowid
+                    except sqlite3.IntegrityError:
+                        # Already tracked (raced with another ingest); chain onto it instead
+                        cursor.execute("SELECT id FROM experiments WHERE file_path = ?", (file_path,))
+                        parent_id = cursor.fetchone()[0]
+                    ids.append(parent_id)
+                cursor.executemany("INSERT OR REPLACE INTO file_manifest (file_path, size, mtime_ns, file_hash) VALUES (?, ?, ?, ?)", manifest_entries)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return ids
+
+    def get_manifest(self):
+        """Returns {file_path: (size, mtime_ns, file_hash)} as of the last scan/commit."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT file_path, size, mtime_ns, file_hash FROM file_manifest")
+            return {r[0]: (r[1], r[2], r[3]) for r in cursor.fetchall()}
+
+    def update_manifest(self, entries):
+        """Upserts [(file_path, size, mtime_ns, file_hash)] in one transaction."""
+        if not entries:
+            return
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO file_manifest (file_path, size, mtime_ns, file_hash) VALUES (?, ?, ?, ?)", entries)
+            self.conn.commit()
+
+    def get_profile(self, file_hash):
+        """Column profile (see core.ingest.profile_frame) for this content, or None."""
+        if not file_hash:
+            return None
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT profile_json FROM column_profiles WHERE file_hash = ?", (file_hash,))
+            res = cursor.fetchone()
+            return json.loads(res[0]) if res else None
+
+    def save_profiles(self, entries):
+        """Upserts [(file_hash, profile_dict)] in one transaction."""
+        if not entries:
+            return
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO column_profiles (file_hash, profile_json) VALUES (?, ?)",
+                                  [(h, json.dumps(p)) for h, p in entries])
+            self.conn.commit()
+
+    def get_all_paths(self):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT file_path FROM experiments")
+            return {r[0] for r in cursor.fetchall()}
+
+    def get_referenced_hashes(self):
+        """All vault hashes still referenced by an existing experiment's history."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+            SELECT DISTINCT h.file_hash FROM node_history h
+            JOIN experiments e ON e.id = h.node_id
+            """)
+            return [r[0] for r in cursor.fetchall()]
+
     def prune_missing_files(self):
         """Remove experiments whose file_path no longer exists on disk."""
         with self.lock:
@@ -169,6 +250,8 @@ class DBHandler:
             for exp_id, file_path in rows:
                 if file_path and not os.path.exists(file_path):
                     cursor.execute("DELETE FROM experiments WHERE id = ?", (exp_id,))
+                    cursor.execute("DELETE FROM node_history WHERE node_id = ?", (exp_id,))
+                    cursor.execute("DELETE FROM file_manifest WHERE file_path = ?", (file_path,))
                     removed = True
 
             if removed:
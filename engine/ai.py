@@ -5,7 +5,10 @@ from pydantic import BaseModel, field_validator
 from typing import List, Any
 from openai import AzureOpenAI
 from dotenv import load_dotenv
-from state_manager import state
+from core.frame_cache import read_frame
+from core.ingest import profile_numeric_columns
+from engine.anomaly import find_anomalies
+from engine.drift import compare_frames
 
 load_dotenv()
 
@@ -47,16 +50,24 @@ class ScienceAI:
                 print(f"AI Connection Failed: {e}")
                 self.client = None
 
-    def get_placeholder_analysis(self, csv_path: str) -> ExperimentSchema:
-        """Fast, local analysis for immediate UI feedback without AI lag."""
+    def get_placeholder_analysis(self, csv_path: str, profile: dict = None) -> ExperimentSchema:
+        """Fast, local analysis for immediate UI feedback without AI lag.
+        With the file's stored column profile, the file isn't parsed at all."""
+        if profile:
+            return self.placeholder_from_shape(profile["rows"], profile["cols"])
         try:
-            df = pd.read_csv(csv_path)
-            cols = len(df.columns)
-            rows = len(df)
-            summary = f"File imported successfully. Contains {rows} rows and {cols} columns. Click 'ANALYZE' to run AI diagnostics."
+            df = read_frame(csv_path)
+            return self.placeholder_from_shape(len(df), len(df.columns))
         except:
+            return self.placeholder_from_shape()
+
+    def placeholder_from_shape(self, rows=None, cols=None) -> ExperimentSchema:
+        """Placeholder analysis for a file already parsed elsewhere (e.g. bulk ingest)."""
+        if rows is None:
             summary = "File imported. Pending analysis."
-            
+        else:
+            summary = f"File imported successfully. Contains {rows} rows and {cols} columns. Click 'ANALYZE' to run AI diagnostics."
+
         return ExperimentSchema(
             summary=summary,
             anomalies=[],
@@ -65,8 +76,8 @@ class ScienceAI:
             ai_generated=False
         )
 
-    def analyze_csv_data(self, csv_path: str, model: str = "gpt-5-mini") -> ExperimentSchema:
-        df = pd.read_csv(csv_path)
+    def analyze_csv_data(self, csv_path: str, model: str = "gpt-5-mini", cancel_token=None) -> ExperimentSchema:
+        df = read_frame(csv_path)
         if df.empty or len(df.columns) < 2 or len(df) < 3:
             return ExperimentSchema(
                 summary="Insufficient data for analysis.",
@@ -75,8 +86,7 @@ class ScienceAI:
                 is_reproducible=False
             )
         
-        if state.stop_ai_requested:
-            state.stop_ai_requested = False
+        if cancel_token and cancel_token.cancelled:
             return self._local_analysis(df)
         
         if self.client:
@@ -99,12 +109,19 @@ class ScienceAI:
         
         return self._local_analysis(df)
 
-    def compare_experiments(self, df1: pd.DataFrame, df2: pd.DataFrame) -> dict:
-        numeric_cols = df1.select_dtypes(include=['number']).columns.intersection(df2.select_dtypes(include=['number']).columns)
-        if len(numeric_cols) == 0: return {"summary": "NO COMMON DATA", "anomalies": []}
-
-        stats1 = df1[numeric_cols].describe().to_json()
-        stats2 = df2[numeric_cols].describe().to_json()
+    def compare_experiments(self, df1: pd.DataFrame, df2: pd.DataFrame, profile1: dict = None, profile2: dict = None) -> dict:
+        """Parent (df1) vs child (df2). Stored column profiles stand in for describe() when given."""
+        if profile1 and profile2:
+            numeric2 = set(profile_numeric_columns(profile2))
+            numeric_cols = pd.Index([c for c in profile_numeric_columns(profile1) if c in numeric2])
+            if len(numeric_cols) == 0: return {"summary": "NO COMMON DATA", "anomalies": []}
+            stats1 = json.dumps({c: profile1["columns"][c] for c in numeric_cols})
+            stats2 = json.dumps({c: profile2["columns"][c] for c in numeric_cols})
+        else:
+            numeric_cols = df1.select_dtypes(include=['number']).columns.intersection(df2.select_dtypes(include=['number']).columns)
+            if len(numeric_cols) == 0: return {"summary": "NO COMMON DATA", "anomalies": []}
+            stats1 = df1[numeric_cols].describe().to_json()
+            stats2 = df2[numeric_cols].describe().to_json()
 
         if self.client:
             try:
@@ -134,13 +151,14 @@ class ScienceAI:
 
     def _local_analysis(self, df):
         cols = df.select_dtypes(include=['number']).columns
+        anomalies = find_anomalies(df)
         return ExperimentSchema(
-            summary=f"Local Analysis: {len(cols)} numeric columns detected. AI unavailable.", 
-            anomalies=[], 
+            summary=f"Local Analysis: {len(cols)} numeric columns scanned over {len(df):,} rows, {len(anomalies)} anomalies flagged. AI unavailable.", 
+            anomalies=anomalies, 
             next_steps="Check AI connection or API Key.", 
             is_reproducible=True, 
             ai_generated=False
         )
 
     def _local_comparison(self, df1, df2, cols):
-        return {"summary": "AI Offline. Manual comparison required.", "anomalies": []}
\ No newline at end of file
+        return compare_frames(df1, df2, cols)
\ No newline at end of file
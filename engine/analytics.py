@@ -2,9 +2,12 @@ import matplotlib
 matplotlib.use('Agg') # Non-interactive backend (Thread-safe)
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.lines import Line2D
 import seaborn as sns
+import numpy as np
 import pandas as pd
 import re
+import threading
 from settings import UITheme
 
 def mpl_color(c):
@@ -38,6 +41,102 @@ class HeaderScanner:
             df.rename(columns={col_name: new_col}, inplace=True)
         return df
 
+# --- DOWNSAMPLING ---
+# A 400px-wide plot can't show more than a few thousand points; above this many
+# points per series the line is drawn from an LTTB-decimated copy.
+DECIMATE_THRESHOLD = 5000
+DECIMATE_POINTS = 2000
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets on sorted x: indices of the `n_out` points that best
+    preserve the line's shape. Keeps the first and last point."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed endpoints
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Average of every bucket in one pass (used as the "next" vertex C)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area (A, candidate, C) for every candidate in the bucket at once
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+def decimate_xy(df, x_col, y_col, max_points=DECIMATE_POINTS, threshold=DECIMATE_THRESHOLD):
+    """Returns (frame_to_plot, total_points). Large series come back x-sorted and LTTB-decimated."""
+    total = len(df)
+    if total <= threshold:
+        return df, total
+    xy = df[[x_col, y_col]].dropna()
+    if not xy[x_col].is_monotonic_increasing:
+        xy = xy.sort_values(x_col, kind="stable")
+    idx = lttb_indices(xy[x_col].to_numpy(), xy[y_col].to_numpy(), max_points)
+    return xy.iloc[idx], total
+
+def _note_series(context, ax, series, x_col, y_col, shown, total):
+    """Records which axes/columns a series was drawn on (for hit-testing) and flags
+    a decimated view in the plot context and the axes title."""
+    context.setdefault("series_cols", {})[series] = (x_col, y_col)
+    context.setdefault("_mpl_axes", []).append((ax, series))
+    if shown >= total:
+        return
+    context.setdefault("decimated", {})[series] = {"shown": shown, "total": total}
+    if "[DECIMATED" in ax.get_title():
+        return  # Overlay: both series share one axes title, mark it once
+    ax.set_title(f"{ax.get_title()} [DECIMATED {shown:,}/{total:,}]", color=ax.title.get_color(), fontsize=8, family='monospace')
+
+def _record_axes(context, canvas):
+    """After canvas.draw(): swaps the live Axes for picklable panel-pixel rects and limits.
+    context["axes"] = [{"rect": (left, top, w, h), "xlim", "ylim", "series": [names]}]"""
+    height = canvas.get_width_height()[1]
+    axes = {}
+    for ax, series in context.pop("_mpl_axes", []):
+        if id(ax) not in axes:
+            box = ax.get_window_extent()
+            axes[id(ax)] = {
+                "rect": (float(box.x0), float(height - box.y1), float(box.width), float(box.height)),
+                "xlim": tuple(float(v) for v in ax.get_xlim()),
+                "ylim": tuple(float(v) for v in ax.get_ylim()),
+                "series": []
+            }
+        axes[id(ax)]["series"].append(series)
+    context["axes"] = list(axes.values())
+
+def attach_series(context, df1, df2=None):
+    """Fills context["series"] with full-resolution x-sorted (x, y) arrays per drawn series,
+    so the tooltip can binary-search in data coordinates. Never pickled or cached."""
+    frames = {"primary": df1, "secondary": df2}
+    series = context.setdefault("series", {})
+    for name, (x_col, y_col) in context.get("series_cols", {}).items():
+        if name not in series and frames.get(name) is not None:
+            series[name] = sorted_xy(frames[name], x_col, y_col, threshold=float("inf"))[:2]
+    return context
+
+def _style_axes(fig):
+    for ax in fig.axes:
+        ax.tick_params(colors=mpl_color(UITheme.TEXT_DIM), labelsize=8)
+        
+        ax.xaxis.label.set_color(mpl_color(UITheme.TEXT_OFF_WHITE))
+        ax.yaxis.label.set_color(mpl_color(UITheme.TEXT_OFF_WHITE))
+        
+        for spine in ax.spines.values():
+            spine_col = UITheme.BORDER if hasattr(UITheme, "BORDER") else UITheme.TEXT_DIM
+            spine.set_edgecolor(mpl_color(spine_col))
+
 def create_seaborn_surface(df1, df2=None, width=400, height=300, x_col=None, y_col=None):
     """
     Generates a Seaborn plot as RAW BYTES (Thread-safe).
@@ -72,8 +171,10 @@ def create_seaborn_surface(df1, df2=None, width=400, height=300, x_col=None, y_c
             context["y_col"] = final_y
 
             if final_x and final_y:
-                sns.lineplot(data=df1, x=final_x, y=final_y, ax=ax, color=line_colors[0], linewidth=2)
+                plot_df, total = decimate_xy(df1, final_x, final_y)
+                sns.lineplot(data=plot_df, x=final_x, y=final_y, ax=ax, color=line_colors[0], linewidth=2)
                 ax.set_title(f"{final_x} vs {final_y}", color=mpl_color(UITheme.ACCENT_ORANGE), fontsize=10, family='monospace')
+                _note_series(context, ax, "primary", final_x, final_y, len(plot_df), total)
             else:
                 ax.text(0.5, 0.5, "INSUFFICIENT DATA", color='gray', ha='center', va='center')
                 
@@ -95,9 +196,13 @@ def create_seaborn_surface(df1, df2=None, width=400, height=300, x_col=None, y_c
                 
                 ax = fig.add_subplot(111)
                 ax.set_facecolor(mpl_color(UITheme.BG_DARK))
-                sns.lineplot(data=df1, x=use_x, y=use_y, ax=ax, color=line_colors[0], linewidth=2, label="Primary")
-                sns.lineplot(data=df2, x=use_x, y=use_y, ax=ax, color=line_colors[1], linewidth=2, label="Secondary")
+                plot_df1, total1 = decimate_xy(df1, use_x, use_y)
+                plot_df2, total2 = decimate_xy(df2, use_x, use_y)
+                sns.lineplot(data=plot_df1, x=use_x, y=use_y, ax=ax, color=line_colors[0], linewidth=2, label="Primary")
+                sns.lineplot(data=plot_df2, x=use_x, y=use_y, ax=ax, color=line_colors[1], linewidth=2, label="Secondary")
                 ax.set_title("COMPARATIVE OVERLAY", color='#ffffff', fontsize=10, family='monospace')
+                _note_series(context, ax, "primary", use_x, use_y, len(plot_df1), total1)
+                _note_series(context, ax, "secondary", use_x, use_y, len(plot_df2), total2)
                 ax.legend(facecolor='#16161a', edgecolor='#333333', labelcolor='white')
             else:
                 # SIDE BY SIDE
@@ -105,33 +210,259 @@ def create_seaborn_surface(df1, df2=None, width=400, height=300, x_col=None, y_c
                 ax1 = fig.add_subplot(211)
                 ax1.set_facecolor('#0d0d0f')
                 if len(cols1) >= 2:
-                    sns.lineplot(data=df1, x=cols1[0], y=cols1[1], ax=ax1, color=line_colors[0])
+                    plot_df1, total1 = decimate_xy(df1, cols1[0], cols1[1])
+                    sns.lineplot(data=plot_df1, x=cols1[0], y=cols1[1], ax=ax1, color=line_colors[0])
+                    _note_series(context, ax1, "primary", cols1[0], cols1[1], len(plot_df1), total1)
                 
                 ax2 = fig.add_subplot(212)
                 ax2.set_facecolor('#0d0d0f')
                 if len(cols2) >= 2:
-                    sns.lineplot(data=df2, x=cols2[0], y=cols2[1], ax=ax2, color=line_colors[1])
+                    plot_df2, total2 = decimate_xy(df2, cols2[0], cols2[1])
+                    sns.lineplot(data=plot_df2, x=cols2[0], y=cols2[1], ax=ax2, color=line_colors[1])
+                    _note_series(context, ax2, "secondary", cols2[0], cols2[1], len(plot_df2), total2)
                 
                 fig.tight_layout()
 
-        # Styling
-        for ax in fig.axes:
-            ax.tick_params(colors=mpl_color(UITheme.TEXT_DIM), labelsize=8)
-            
-            ax.xaxis.label.set_color(mpl_color(UITheme.TEXT_OFF_WHITE))
-            ax.yaxis.label.set_color(mpl_color(UITheme.TEXT_OFF_WHITE))
-            
-            for spine in ax.spines.values():
-                spine_col = UITheme.BORDER if hasattr(UITheme, "BORDER") else UITheme.TEXT_DIM
-                spine.set_edgecolor(mpl_color(spine_col))
+        _style_axes(fig)
 
         # RENDER TO BYTES (Crucial Step)
         canvas.draw()
         raw_string = canvas.buffer_rgba()
         size = canvas.get_width_height()
+        _record_axes(context, canvas)
+        attach_series(context, df1, df2)
         
         return raw_string, size, context
 
     except Exception as e:
         print(f"Plotting Error: {e}")
-        return None, (width, height), None
\ No newline at end of file
+        return None, (width, height), None
+
+# --- FAST LINE RENDERER ---
+# Draws Line2D artists straight from sorted NumPy arrays: no seaborn grouping or
+# bootstrap CIs, and each worker thread keeps its Figure/Canvas between renders.
+_render_local = threading.local()
+
+def _reusable_figure(width, height):
+    figures = getattr(_render_local, "figures", None)
+    if figures is None:
+        figures = _render_local.figures = {}
+    if (width, height) not in figures:
+        fig = Figure(figsize=(width/80, height/80), dpi=80)
+        figures[(width, height)] = (fig, FigureCanvasAgg(fig))
+    fig, canvas = figures[(width, height)]
+    fig.clear()
+    fig.set_facecolor(mpl_color(UITheme.PANEL_GREY))
+    return fig, canvas
+
+def sorted_xy(df, x_col, y_col, max_points=DECIMATE_POINTS, threshold=DECIMATE_THRESHOLD):
+    """Float arrays sorted by x with NaN rows dropped, LTTB-decimated above `threshold`.
+    Returns (x, y, total_points)."""
+    x = pd.to_numeric(df[x_col], errors="coerce").to_numpy(dtype=np.float64)
+    y = pd.to_numeric(df[y_col], errors="coerce").to_numpy(dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    if not keep.all():
+        x, y = x[keep], y[keep]
+    if len(x) > 1 and np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    total = len(df)
+    if total > threshold:
+        idx = lttb_indices(x, y, max_points)
+        x, y = x[idx], y[idx]
+    return x, y, total
+
+def _draw_line(ax, df, x_col, y_col, color, linewidth, label=None, context=None, series=None):
+    x, y, total = sorted_xy(df, x_col, y_col, threshold=float("inf"))
+    if context is not None:
+        # The full sorted arrays double as the tooltip's search index
+        context.setdefault("series", {})[series] = (x, y)
+    if total > DECIMATE_THRESHOLD:
+        idx = lttb_indices(x, y, DECIMATE_POINTS)
+        x, y = x[idx], y[idx]
+    ax.add_line(Line2D(x, y, color=color, linewidth=linewidth, label=label))
+    ax.autoscale_view()
+    ax.set_xlabel(x_col)
+    ax.set_ylabel(y_col)
+    return len(x), total
+
+def create_line_surface(df1, df2=None, width=400, height=300, x_col=None, y_col=None):
+    """Same layout and contract as create_seaborn_surface, drawn with plain Line2D."""
+    fig, canvas = _reusable_figure(width, height)
+    try:
+        context = {
+            "type": "single",
+            "df": df1,
+            "x_col": x_col,
+            "y_col": y_col,
+            "overlay": False
+        }
+
+        line_colors = ['#ff7800', '#00d4ff']
+
+        if df2 is None:
+            ax = fig.add_subplot(111)
+            ax.set_facecolor(mpl_color(UITheme.BG_DARK))
+
+            numeric_cols = df1.select_dtypes(include=['number']).columns
+            final_x = x_col if x_col and x_col in numeric_cols else (numeric_cols[0] if len(numeric_cols) > 0 else None)
+            final_y = y_col if y_col and y_col in numeric_cols else (numeric_cols[1] if len(numeric_cols) > 1 else None)
+
+            context["x_col"] = final_x
+            context["y_col"] = final_y
+
+            if final_x and final_y:
+                shown, total = _draw_line(ax, df1, final_x, final_y, line_colors[0], 2, context=context, series="primary")
+                ax.set_title(f"{final_x} vs {final_y}", color=mpl_color(UITheme.ACCENT_ORANGE), fontsize=10, family='monospace')
+                _note_series(context, ax, "primary", final_x, final_y, shown, total)
+            else:
+                ax.text(0.5, 0.5, "INSUFFICIENT DATA", color='gray', ha='center', va='center')
+
+        else:
+            context["type"] = "dual"
+            cols1 = df1.select_dtypes(include=['number']).columns
+            cols2 = df2.select_dtypes(include=['number']).columns
+            common_cols = [c for c in cols1 if c in cols2]
+
+            use_x = x_col if x_col in common_cols else (common_cols[0] if len(common_cols)>0 else None)
+            use_y = y_col if y_col in common_cols else (common_cols[1] if len(common_cols)>1 else None)
+
+            if use_x and use_y:
+                context["overlay"] = True
+                context["x_col"] = use_x
+                context["y_col"] = use_y
+
+                ax = fig.add_subplot(111)
+                ax.set_facecolor(mpl_color(UITheme.BG_DARK))
+                shown1, total1 = _draw_line(ax, df1, use_x, use_y, line_colors[0], 2, "Primary", context, "primary")
+                shown2, total2 = _draw_line(ax, df2, use_x, use_y, line_colors[1], 2, "Secondary", context, "secondary")
+                ax.set_title("COMPARATIVE OVERLAY", color='#ffffff', fontsize=10, family='monospace')
+                _note_series(context, ax, "primary", use_x, use_y, shown1, total1)
+                _note_series(context, ax, "secondary", use_x, use_y, shown2, total2)
+                ax.legend(facecolor='#16161a', edgecolor='#333333', labelcolor='white')
+            else:
+                context["overlay"] = False
+                ax1 = fig.add_subplot(211)
+                ax1.set_facecolor('#0d0d0f')
+                if len(cols1) >= 2:
+                    shown1, total1 = _draw_line(ax1, df1, cols1[0], cols1[1], line_colors[0], 1.5, context=context, series="primary")
+                    _note_series(context, ax1, "primary", cols1[0], cols1[1], shown1, total1)
+
+                ax2 = fig.add_subplot(212)
+                ax2.set_facecolor('#0d0d0f')
+                if len(cols2) >= 2:
+                    shown2, total2 = _draw_line(ax2, df2, cols2[0], cols2[1], line_colors[1], 1.5, context=context, series="secondary")
+                    _note_series(context, ax2, "secondary", cols2[0], cols2[1], shown2, total2)
+
+                fig.tight_layout()
+
+        _style_axes(fig)
+
+        canvas.draw()
+        # The canvas is reused by this thread's next render, so hand out a copy
+        raw_string = bytes(canvas.buffer_rgba())
+        size = canvas.get_width_height()
+        _record_axes(context, canvas)
+
+        return raw_string, size, context
+
+    except Exception as e:
+        print(f"Plotting Error: {e}")
+        return None, (width, height), None
+
+def create_plot_surface(df1, df2=None, width=400, height=300, x_col=None, y_col=None, mode="fast"):
+    """Dispatches on plot mode: "fast" (Line2D) or "statistical" (seaborn aggregation + CIs)."""
+    render = create_seaborn_surface if mode == "statistical" else create_line_surface
+    return render(df1, df2, width=width, height=height, x_col=x_col, y_col=y_col)
+
+# --- MULTI-RESOLUTION MIN/MAX PYRAMID ---
+class MinMaxPyramid:
+    """Per-block min/max of a sorted series at resolutions 4, 16, 64... points per block.
+    Built once per dataset; `query` answers any visible x-range with at most ~4 points per
+    pixel while keeping every peak, so zoom/pan never touches the full arrays."""
+    FACTOR = 4
+    MIN_BLOCKS = 64
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        # Each level: (x_start, x_end, y_min, y_max, x_at_min, x_at_max)
+        self.levels = []
+        level = (self.x, self.x, self.y, self.y, self.x, self.x)
+        while len(level[0]) > self.MIN_BLOCKS:
+            level = self._coarsen(level)
+            self.levels.append(level)
+
+    def _coarsen(self, level):
+        f = self.FACTOR
+        pad = (-len(level[0])) % f
+        if pad:
+            level = tuple(np.concatenate([a, np.repeat(a[-1:], pad)]) for a in level)
+        xs, xe, ymin, ymax, xmn, xmx = (a.reshape(-1, f) for a in level)
+        imin = ymin.argmin(axis=1)[:, None]
+        imax = ymax.argmax(axis=1)[:, None]
+        return (
+            xs[:, 0], xe[:, -1],
+            np.take_along_axis(ymin, imin, axis=1)[:, 0],
+            np.take_along_axis(ymax, imax, axis=1)[:, 0],
+            np.take_along_axis(xmn, imin, axis=1)[:, 0],
+            np.take_along_axis(xmx, imax, axis=1)[:, 0],
+        )
+
+    @property
+    def x_range(self):
+        return (float(self.x[0]), float(self.x[-1])) if len(self.x) else (0.0, 1.0)
+
+    def query(self, x0, x1, n_pixels):
+        """(x, y) arrays covering [x0, x1] (plus one neighbour each side) at screen resolution."""
+        n = len(self.x)
+        i0 = max(0, int(np.searchsorted(self.x, x0)) - 1)
+        i1 = min(n, int(np.searchsorted(self.x, x1, side="right")) + 1)
+        if i1 - i0 <= 2 * n_pixels or not self.levels:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        for xs, xe, ymin, ymax, xmn, xmx in self.levels:
+            b0 = max(0, int(np.searchsorted(xe, x0)) - 1)
+            b1 = min(len(xs), int(np.searchsorted(xs, x1, side="right")) + 1)
+            if b1 - b0 <= 2 * n_pixels:
+                break
+        xmn, xmx, ymin, ymax = xmn[b0:b1], xmx[b0:b1], ymin[b0:b1], ymax[b0:b1]
+        # Two vertices per block, in x order, so the polyline passes through both extremes
+        min_first = xmn <= xmx
+        out_x = np.empty(2 * len(xmn))
+        out_y = np.empty(2 * len(xmn))
+        out_x[0::2] = np.where(min_first, xmn, xmx)
+        out_x[1::2] = np.where(min_first, xmx, xmn)
+        out_y[0::2] = np.where(min_first, ymin, ymax)
+        out_y[1::2] = np.where(min_first, ymax, ymin)
+        return out_x, out_y
+
+def resolve_columns(df1, df2=None, x_col=None, y_col=None):
+    """The (x, y) columns a plot of these frames would use (None when there aren't two)."""
+    cols = df1.select_dtypes(include=['number']).columns
+    if df2 is not None:
+        cols2 = df2.select_dtypes(include=['number']).columns
+        cols = [c for c in cols if c in cols2]
+    final_x = x_col if x_col and x_col in cols else (cols[0] if len(cols) > 0 else None)
+    final_y = y_col if y_col and y_col in cols else (cols[1] if len(cols) > 1 else None)
+    return final_x, final_y
+
+def build_native_context(df1, df2=None, x_col=None, y_col=None):
+    """Context for the pygame plot widget: no bitmap, one MinMaxPyramid per series.
+    Returns None when the frames can't share one axes (side-by-side needs a bitmap)."""
+    final_x, final_y = resolve_columns(df1, df2, x_col, y_col)
+    if not (final_x and final_y):
+        return None
+    pyramids = {"primary": MinMaxPyramid(*sorted_xy(df1, final_x, final_y, threshold=float("inf"))[:2])}
+    if df2 is not None:
+        pyramids["secondary"] = MinMaxPyramid(*sorted_xy(df2, final_x, final_y, threshold=float("inf"))[:2])
+    # The widget records "axes" on each draw; the pyramids' base arrays are the search index
+    return {
+        "type": "single" if df2 is None else "dual",
+        "df": df1,
+        "x_col": final_x,
+        "y_col": final_y,
+        "overlay": df2 is not None,
+        "pyramids": pyramids,
+        "series": {name: (p.x, p.y) for name, p in pyramids.items()}
+    }
@@ -0,0 +1,153 @@
+# --- FILE: engine/anomaly.py ---
+# Local anomaly detection for when AI is offline. Every check runs on the whole numeric
+# matrix (one row per column) at once with NumPy instead of looping over columns.
+import numpy as np
+
+# Robust z-score (0.6745 * |x - median| / MAD) above which a point is an outlier.
+# Higher than the textbook 3.5 so plain Gaussian noise on a million rows stays quiet.
+MAD_THRESHOLD = 5.0
+# Median/MAD are estimated from at most this many evenly strided rows
+MAD_SAMPLE = 200_000
+# A point this many trailing-window standard deviations from the window mean is a spike
+SPIKE_WINDOW = 50
+SPIKE_Z = 8.0
+# Runs of repeated values / missing values at least this long are reported
+FLATLINE_MIN_RUN = 50
+DROPOUT_MIN_RUN = 5
+# A step this many times the median step is a sampling gap in a time-like column
+GAP_FACTOR = 5.0
+# Columns with at least this share of steps in one direction are treated as monotonic
+MONOTONIC_SHARE = 0.99
+MAX_FINDINGS = 20
+
+def numeric_matrix(df):
+    """(column_names, float64 array of shape columns x rows) for the numeric columns.
+    Column-major so every per-column scan below walks contiguous memory."""
+    numeric = df.select_dtypes(include=['number'])
+    values = np.ascontiguousarray(numeric.to_numpy(dtype=np.float64, na_value=np.nan).T)
+    return [str(c) for c in numeric.columns], values
+
+def _median(values):
+    """Per-column median over a strided sample; NaN-aware only when it has to be."""
+    ref = values[:, ::max(1, values.shape[1] // MAD_SAMPLE)]
+    if np.isnan(ref).any():
+        return np.nanmedian(ref, axis=1, keepdims=True), ref
+    return np.median(ref, axis=1, keepdims=True), ref
+
+def longest_runs(mask):
+    """Per column (row of `mask`): (longest run of True, index where it starts)."""
+    counts = np.cumsum(mask, axis=1, dtype=np.int64)
+    # Running count minus its value at the last False = length of the current True run
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+    runs = counts - resets
+    ends = runs.argmax(axis=1)
+    lengths = runs[np.arange(mask.shape[0]), ends]
+    return lengths, ends - lengths + 1
+
+def robust_outliers(values, threshold=MAD_THRESHOLD):
+    """Boolean matrix of MAD outliers; columns with zero spread never flag."""
+    median, ref = _median(values)
+    mad, _ = _median(np.abs(ref - median))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # |x - median| > threshold * MAD / 0.6745, without materialising z
+        return np.abs(values - median) > np.where(mad > 0, mad, np.nan) * (threshold / 0.6745)
+
+def rolling_spikes(values, window=SPIKE_WINDOW, z_limit=SPIKE_Z):
+    """Boolean matrix of points far outside their trailing window's mean +/- std.
+    Window sums come from cumulative sums, so this is O(rows) with no Python loop."""
+    n = values.shape[1]
+    spikes = np.zeros(values.shape, dtype=bool)
+    if n <= window + 1:
+        return spikes
+    missing = np.isnan(values)
+    has_missing = missing.any()
+    # Centering keeps the running sums of squares well conditioned
+    centered = values - _median(values)[0]
+    if has_missing:
+        centered[missing] = 0.0
+    s1 = np.cumsum(centered, axis=1)
+    s2 = np.cumsum(centered * centered, axis=1)
+
+    # Stats of rows [i - window, i) for every row i > window: s[i - 1] - s[i - window - 1]
+    lo, hi = slice(0, n - window - 1), slice(window, n - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if has_missing:
+            cnt = np.cumsum(~missing, axis=1)
+            wn = cnt[:, hi] - cnt[:, lo]
+        else:
+            wn = window
+        mean = (s1[:, hi] - s1[:, lo]) / wn
+        var = (s2[:, hi] - s2[:, lo]) / wn - mean * mean
+        dev = centered[:, window + 1:] - mean
+        # |dev| > z * std  <=>  dev^2 > z^2 * var  (no sqrt, and var <= 0 never flags)
+        flagged = (dev * dev > z_limit * z_limit * var) & (var > 0)
+        if has_missing:
+            flagged &= ~missing[:, window + 1:] & (wn >= window // 2)
+    spikes[:, window + 1:] = flagged
+    return spikes
+
+def _first_rows(mask):
+    """Per column: number of True rows and the first one (-1 when none)."""
+    counts = mask.sum(axis=1)
+    return counts, np.where(counts > 0, mask.argmax(axis=1), -1)
+
+def scan(df):
+    """All checks over every numeric column. Returns [(severity, message)], unsorted."""
+    names, values = numeric_matrix(df)
+    n = values.shape[1]
+    findings = []
+    if n < 3 or not names:
+        return findings
+
+    counts, first = _first_rows(robust_outliers(values))
+    for c in np.flatnonzero(counts):
+        findings.append((counts[c] / n * 100, f"OUTLIERS: {names[c]} has {counts[c]:,} points beyond robust z {MAD_THRESHOLD} (first at row {first[c]:,})"))
+
+    counts, first = _first_rows(rolling_spikes(values))
+    for c in np.flatnonzero(counts):
+        findings.append((50 + counts[c], f"SPIKE: {names[c]} jumps > {SPIKE_Z:g} sigma from its {SPIKE_WINDOW}-row trend at {counts[c]:,} rows (first at row {first[c]:,})"))
+
+    # Run lengths only for columns that have enough repeats/NaNs to possibly qualify
+    steps = np.diff(values, axis=1)
+    repeats = steps == 0
+    cols = np.flatnonzero(repeats.sum(axis=1) + 1 >= FLATLINE_MIN_RUN)
+    lengths, starts = longest_runs(repeats[cols])
+    for c, length, start in zip(cols, lengths, starts):
+        run = length + 1
+        if run < FLATLINE_MIN_RUN:
+            continue
+        if run >= n:
+            findings.append((20, f"FLATLINE: {names[c]} is constant ({values[c, 0]:.6g}) across all {n:,} rows"))
+        else:
+            findings.append((run / n * 100, f"FLATLINE: {names[c]} stuck at {values[c, start]:.6g} for {run:,} rows (from row {start:,})"))
+
+    missing = np.isnan(values)
+    total_missing = missing.sum(axis=1)
+    cols = np.flatnonzero(total_missing >= DROPOUT_MIN_RUN)
+    lengths, starts = longest_runs(missing[cols])
+    for c, length, start in zip(cols, lengths, starts):
+        if length >= DROPOUT_MIN_RUN:
+            findings.append((total_missing[c] / n * 100 + 10, f"DROPOUT: {names[c]} missing {length:,} consecutive rows from row {start:,} ({total_missing[c]:,} missing in total)"))
+
+    # Time-like / counter columns: steps almost all one direction
+    with np.errstate(invalid="ignore"):
+        up, down = (steps > 0).sum(axis=1), (steps < 0).sum(axis=1)
+    moving = np.maximum(up + down, 1)
+    for c in np.flatnonzero(np.maximum(up, down) / moving >= MONOTONIC_SHARE):
+        rising = up[c] >= down[c]
+        col_steps = steps[c]
+        breaks = col_steps < 0 if rising else col_steps > 0
+        if breaks.any():
+            findings.append((80 + breaks.sum(), f"MONOTONICITY: {names[c]} {'decreases' if rising else 'increases'} {breaks.sum():,} times (first at row {breaks.argmax() + 1:,})"))
+        forward = np.abs(col_steps[~breaks & (col_steps != 0)])
+        if len(forward) > 1:
+            gaps = np.abs(col_steps) > GAP_FACTOR * np.median(forward)
+            gaps &= ~breaks
+            if gaps.any():
+                findings.append((30 + gaps.sum(), f"DROPOUT: {names[c]} has {gaps.sum():,} sampling gaps > {GAP_FACTOR:g}x the median step (first after row {gaps.argmax():,})"))
+    return findings
+
+def find_anomalies(df, max_findings=MAX_FINDINGS):
+    """Anomaly strings for ExperimentSchema.anomalies, most severe first."""
+    findings = sorted(scan(df), key=lambda f: f[0], reverse=True)
+    return [message for _, message in findings[:max_findings]]
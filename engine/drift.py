@@ -0,0 +1,156 @@
+# --- FILE: engine/drift.py ---
+# Local parent-vs-child drift comparison for when AI is offline: distribution shift per
+# common numeric column, plus residuals of the child against the parent on a shared x.
+import numpy as np
+
+# KS / residual work is done on at most this many evenly strided rows per frame
+DRIFT_SAMPLE = 100_000
+# Flag thresholds: Cohen's d (small effect), KS distance, variance ratio, residual RMS in parent sigmas
+EFFECT_SIZE_MIN = 0.2
+KS_D_MIN = 0.1
+VARIANCE_RATIO_MAX = 2.0
+RESIDUAL_RMS_MIN = 0.25
+# A shift is only reported if the KS test also rejects "same distribution" at this level,
+# and neither frame has fewer than MIN_SAMPLES values in the column (nothing is read off 3 rows)
+KS_P_MAX = 0.01
+MIN_SAMPLES = 20
+# Residuals are averaged into this many x bins first, so uncorrelated noise cancels
+RESIDUAL_BINS = 100
+# ...and the binned RMS must be this many times what noise alone leaves in a bin mean
+RESIDUAL_NOISE_RATIO = 3.0
+MAX_FINDINGS = 20
+
+def _nan_moments(values, ddof=1):
+    """Per-row (mean, variance) ignoring NaNs; rows with too few values come out NaN.
+    np.nanmean/nanvar would also report those through warnings.warn, which a worker
+    thread can't silence without touching every thread's filters."""
+    n = (~np.isnan(values)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=1) / n
+        var = np.nansum((values - mean[:, None]) ** 2, axis=1) / (n - ddof)
+    return mean, var
+
+def _matrix(df, cols):
+    """Columns x rows float64 array (contiguous per column)."""
+    return np.ascontiguousarray(df[list(cols)].to_numpy(dtype=np.float64, na_value=np.nan).T)
+
+def _stride(values, limit=DRIFT_SAMPLE):
+    return values[:, ::max(1, values.shape[1] // limit)]
+
+def ks_pvalue(d, n1, n2):
+    """Asymptotic two-sided p-value of the two-sample KS statistic (Kolmogorov series)."""
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    ne = n1 * n2 / (n1 + n2)
+    lam = (np.sqrt(ne) + 0.12 + 0.11 / np.sqrt(ne)) * d
+    if lam < 0.2:
+        return 1.0
+    k = np.arange(1, 101)
+    return float(min(1.0, max(0.0, 2 * np.sum((-1.0) ** (k - 1) * np.exp(-2 * k * k * lam * lam)))))
+
+def ks_statistics(a, b):
+    """Two-sample KS distance per column of two (columns x rows) arrays; NaNs ignored.
+    Sorting is one 2-D call; each column then needs two searchsorted passes."""
+    a, b = np.sort(a, axis=1), np.sort(b, axis=1)  # NaNs sort to the end
+    na, nb = (~np.isnan(a)).sum(axis=1), (~np.isnan(b)).sum(axis=1)
+    d = np.zeros(len(a))
+    for c in range(len(a)):
+        xa, xb = a[c, :na[c]], b[c, :nb[c]]
+        if not len(xa) or not len(xb):
+            continue
+        grid = np.concatenate([xa, xb])
+        cdf_a = np.searchsorted(xa, grid, side="right") / len(xa)
+        cdf_b = np.searchsorted(xb, grid, side="right") / len(xb)
+        d[c] = np.abs(cdf_a - cdf_b).max()
+    return d, na, nb
+
+def _shared_x_residuals(df1, df2, x_col, cols, bins=RESIDUAL_BINS):
+    """Child (linearly interpolated onto the parent's x) minus parent inside the overlapping
+    x range, averaged per x bin. Returns (bin_centers, residuals columns x bins, noise floor per
+    column: the std of a bin mean if the residuals were pure noise) or (None, None, None)."""
+    frames = []
+    for df in (df1, df2):
+        x = df[x_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        order = np.argsort(x, kind="stable")
+        order = order[~np.isnan(x[order])]
+        frames.append((x[order], _matrix(df, cols)[:, order]))
+    (x1, y1), (x2, y2) = frames
+    if len(x1) < 2 or len(x2) < 2:
+        return None, None, None
+    lo, hi = max(x1[0], x2[0]), min(x1[-1], x2[-1])
+    inside = (x1 >= lo) & (x1 <= hi)
+    if hi <= lo or inside.sum() < 2:
+        return None, None, None
+    keep = np.flatnonzero(inside)[::max(1, inside.sum() // DRIFT_SAMPLE)]
+    grid = x1[keep]
+    residuals = np.full((len(cols), len(grid)), np.nan)
+    for c in range(len(cols)):
+        valid = ~np.isnan(y2[c])
+        if valid.sum() >= 2:
+            residuals[c] = np.interp(grid, x2[valid], y2[c][valid]) - y1[c][keep]
+
+    starts = np.linspace(0, len(grid), min(bins, len(grid)) + 1).astype(np.int64)[:-1]
+    finite = ~np.isnan(residuals)
+    counts = np.add.reduceat(finite, starts, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        binned = np.add.reduceat(np.where(finite, residuals, 0.0), starts, axis=1) / counts
+        floor = np.sqrt(_nan_moments(residuals, ddof=0)[1]) / np.sqrt(np.maximum(counts, 1).mean(axis=1))
+    centers = np.add.reduceat(grid, starts) / np.diff(np.append(starts, len(grid)))
+    return centers, binned, floor
+
+def compare_frames(df1, df2, cols, x_col=None):
+    """Parent (df1) vs child (df2) over the common numeric `cols`.
+    Returns the compare_experiments contract: {"summary": str, "anomalies": [str]}."""
+    cols = list(cols)
+    if not cols:
+        return {"summary": "NO COMMON DATA", "anomalies": []}
+    a, b = _matrix(df1, cols), _matrix(df2, cols)
+
+    (mean1, var1), (mean2, var2) = _nan_moments(a), _nan_moments(b)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std1 = np.sqrt(var1)
+        pooled = np.sqrt((var1 + var2) / 2)
+        cohen_d = np.where(pooled > 0, (mean2 - mean1) / pooled, 0.0)
+        var_ratio = np.where(var1 > 0, var2 / var1, np.where(var2 > 0, np.inf, 1.0))
+    ks_d, na, nb = ks_statistics(_stride(a), _stride(b))
+    enough = np.minimum(na, nb) >= MIN_SAMPLES
+
+    findings = []  # (severity, column, message)
+    for c, col in enumerate(cols):
+        if not enough[c]:
+            continue
+        p = ks_pvalue(ks_d[c], na[c], nb[c])
+        if (abs(cohen_d[c]) >= EFFECT_SIZE_MIN or ks_d[c] >= KS_D_MIN) and p < KS_P_MAX:
+            shift = mean2[c] - mean1[c]
+            sigmas = f" ({shift / std1[c]:+.2f} sigma)" if std1[c] > 0 else ""
+            findings.append((max(abs(cohen_d[c]), 2 * ks_d[c]), col,
+                             f"DRIFT: {col} mean {mean1[c]:.6g} -> {mean2[c]:.6g}{sigmas}, d={cohen_d[c]:+.2f}, KS D={ks_d[c]:.2f} ({'p<1e-16' if p < 1e-16 else f'p={p:.1e}'})"))
+        ratio = var_ratio[c]
+        if np.isfinite(ratio) and ratio > 0 and max(ratio, 1 / ratio) >= VARIANCE_RATIO_MAX:
+            findings.append((abs(np.log2(ratio)) / 2, col,
+                             f"VARIANCE: {col} spread {'x' if ratio >= 1 else '/'}{max(ratio, 1 / ratio):.2f} (std {np.sqrt(var1[c]):.4g} -> {np.sqrt(var2[c]):.4g})"))
+
+    x_col = x_col if x_col in cols else cols[0]
+    y_cols = [c for c in cols if c != x_col]
+    if y_cols:
+        grid, residuals, floor = _shared_x_residuals(df1, df2, x_col, y_cols)
+        if grid is not None and len(grid) >= MIN_SAMPLES:
+            rms = np.sqrt(_nan_moments(residuals ** 2)[0])
+            for i, col in enumerate(y_cols):
+                scale = std1[cols.index(col)]
+                if not np.isfinite(rms[i]) or scale <= 0 or rms[i] / scale < RESIDUAL_RMS_MIN:
+                    continue
+                if rms[i] < RESIDUAL_NOISE_RATIO * floor[i]:
+                    continue  # Within what per-bin noise produces: too few points to tell
+                worst = int(np.nanargmax(np.abs(residuals[i])))
+                findings.append((rms[i] / scale * 2, col,
+                                 f"RESIDUAL: {col} vs {x_col}: binned RMS {rms[i]:.4g} ({rms[i] / scale:.2f} sigma), worst {residuals[i, worst]:+.4g} near {x_col}={grid[worst]:.6g}"))
+
+    findings.sort(key=lambda f: f[0], reverse=True)
+    anomalies = [message for _, _, message in findings[:MAX_FINDINGS]]
+    drifted = list(dict.fromkeys(col for _, col, _ in findings))  # Most severe first
+    if anomalies:
+        summary = f"Local drift comparison over {len(cols)} common columns: {len(drifted)} changed ({', '.join(drifted[:5])}). AI unavailable."
+    else:
+        summary = f"Local drift comparison over {len(cols)} common columns: no significant drift. AI unavailable."
+    return {"summary": summary, "anomalies": anomalies}
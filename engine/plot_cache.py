@@ -0,0 +1,97 @@
+# --- FILE: engine/plot_cache.py ---
+# Rendered plots keyed by what they depend on: file content, axes, theme, size and
+# renderer version. Hot entries live in an in-memory LRU; everything is also written
+# (zlib-compressed) under .sci_vault/plot_cache so re-selecting survives restarts.
+import os
+import json
+import zlib
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Bump whenever the renderers' output changes, to invalidate old renders
+RENDER_VERSION = 4
+PLOT_CACHE_DIRNAME = "plot_cache"
+MAX_DISK_ENTRIES = 2000
+HEADER_LEN = struct.Struct(">I")
+
+def plot_key(file_hash, x_col, y_col, theme_name, size, mode="fast"):
+    raw = json.dumps([file_hash, x_col, y_col, theme_name, list(size), mode, RENDER_VERSION])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class PlotCache:
+    """Byte-budgeted LRU of (raw_rgba, size, context_without_frames) with a disk tier.
+    The tooltip's series arrays are rebuilt from the frame on a hit, not stored."""
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {key: (raw, size, meta)}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def _remember(self, key, raw, size, meta):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= len(self.entries.pop(key)[0])
+            self.entries[key] = (raw, size, meta)
+            self.total_bytes += len(raw)
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (old_raw, _, _) = self.entries.popitem(last=False)
+                self.total_bytes -= len(old_raw)
+
+    def get(self, cache_dir, key):
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit:
+                self.entries.move_to_end(key)
+                return hit
+
+        path = os.path.join(cache_dir, key + ".plot")
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            (header_len,) = HEADER_LEN.unpack_from(blob)
+            header = json.loads(blob[HEADER_LEN.size:HEADER_LEN.size + header_len])
+            raw = zlib.decompress(blob[HEADER_LEN.size + header_len:])
+            size = tuple(header["size"])
+            if len(raw) != size[0] * size[1] * 4:
+                raise ValueError("truncated plot")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Plot Cache Read Failed ({key}): {e}")
+            return None
+
+        os.utime(path)  # Disk eviction is by last use
+        self._remember(key, raw, size, header["context"])
+        return raw, size, header["context"]
+
+    def put(self, cache_dir, key, raw, size, context):
+        raw = bytes(raw)
+        meta = {k: v for k, v in context.items() if k not in ("df", "series")}
+        self._remember(key, raw, size, meta)
+
+        header = json.dumps({"size": list(size), "context": meta}).encode("utf-8")
+        path = os.path.join(cache_dir, key + ".plot")
+        tmp_path = f"{path}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER_LEN.pack(len(header)))
+                f.write(header)
+                f.write(zlib.compress(raw, 1))
+            os.replace(tmp_path, path)
+            self._prune_disk(cache_dir)
+        except OSError as e:
+            print(f"Plot Cache Write Failed: {e}")
+
+    def _prune_disk(self, cache_dir):
+        names = [n for n in os.listdir(cache_dir) if n.endswith(".plot")]
+        if len(names) <= MAX_DISK_ENTRIES:
+            return
+        paths = sorted((os.path.join(cache_dir, n) for n in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - MAX_DISK_ENTRIES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,108 @@
+# --- FILE: engine/render_pool.py ---
+# Optional process-pool render backend (cfg "render_backend": "process").
+# Matplotlib holds the GIL for most of a render, which stalls the pygame loop when it
+# runs on a worker thread. Here the figure is drawn in a warm child process and the
+# RGBA pixels come back through a shared-memory block the parent owns.
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import pandas as pd
+from core.config import cfg
+from engine.analytics import create_plot_surface, attach_series
+
+RENDER_WORKERS = 2
+
+def _warm_up():
+    """Pool initializer: pays the matplotlib/seaborn import and font-cache cost once per process."""
+    warm = pd.DataFrame({"x": [0.0, 1.0], "y": [0.0, 1.0]})
+    for mode in ("fast", "statistical"):
+        create_plot_surface(warm, mode=mode)
+
+def _render_job(shm_name, df1, df2, width, height, x_col, y_col, theme_name, mode):
+    """Runs in the child: renders into the parent's shared block, returns (size, context-without-df)."""
+    from ui.styles import theme
+    if cfg.data.get("theme") != theme_name:
+        cfg.data["theme"] = theme_name
+        theme.update_theme()
+
+    raw, size, context = create_plot_surface(df1, df2, width=width, height=height, x_col=x_col, y_col=y_col, mode=mode)
+    if raw is None:
+        return size, None
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Pool children share the parent's resource tracker, so attaching here
+        # does not claim the block; the parent unlinks it after copying
+        view = memoryview(raw).cast("B")
+        if view.nbytes > shm.size:
+            raise ValueError(f"Rendered {size} does not fit the {width}x{height} buffer")
+        shm.buf[:view.nbytes] = view
+    finally:
+        shm.close()
+
+    # The parent still has the frames: don't pickle them (or arrays derived from them) back
+    context.pop("df", None)
+    context.pop("series", None)
+    return size, context
+
+def _numeric_only(df):
+    """The renderer only plots numeric columns, so only those cross the process boundary."""
+    return df.select_dtypes(include=['number']) if df is not None else None
+
+class RenderPool:
+    def __init__(self, max_workers=RENDER_WORKERS):
+        self.max_workers = max_workers
+        self.executor = None
+        self.lock = threading.Lock()
+        self.disabled = False
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up
+                )
+            return self.executor
+
+    def render(self, df1, df2=None, width=400, height=300, x_col=None, y_col=None, mode="fast"):
+        """Same contract as create_plot_surface: (raw_buffer, size_tuple, context_dict)."""
+        shm = shared_memory.SharedMemory(create=True, size=width * height * 4)
+        try:
+            future = self._get_executor().submit(
+                _render_job, shm.name, _numeric_only(df1), _numeric_only(df2),
+                width, height, x_col, y_col, cfg.data.get("theme", "LIGHT"), mode
+            )
+            size, context = future.result()
+            if context is None:
+                return None, size, None
+            raw = bytes(shm.buf[:size[0] * size[1] * 4])
+            context["df"] = df1
+            return raw, size, attach_series(context, df1, df2)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+_pool = RenderPool()
+atexit.register(_pool.shutdown)
+
+def render_surface(df1, df2=None, width=400, height=300, x_col=None, y_col=None, mode=None):
+    """Renders with the configured backend and plot mode, falling back to the calling thread if the pool fails."""
+    mode = mode or cfg.data.get("plot_mode", "fast")
+    if cfg.data.get("render_backend", "thread") == "process" and not _pool.disabled:
+        try:
+            return _pool.render(df1, df2, width=width, height=height, x_col=x_col, y_col=y_col, mode=mode)
+        except Exception as e:
+            print(f"Render Pool Failed, rendering in-thread: {e}")
+            _pool.disabled = True
+            _pool.shutdown()
+    return create_plot_surface(df1, df2, width=width, height=height, x_col=x_col, y_col=y_col, mode=mode)
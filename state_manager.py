@@ -59,7 +59,7 @@ class AppState:
         self.selected_project_path = ""
 
         self.analysis_scroll_y = 0
-        self.stop_ai_requested = False
+        self.ai_cancel_token = None  # Token of the AI request the STOP button aborts
         self.minimap_collapsed = False
         
         # UNDO/REDO STATE
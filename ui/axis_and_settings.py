@@ -11,6 +11,18 @@ class AxisSelector:
         self.font = pygame.font.SysFont("Consolas", 12)
         self.close_btn = Button(0, 0, 20, 20, "X", (200, 50, 50))
 
+    @staticmethod
+    def _has_columns(context):
+        """Cached renders carry numeric_cols but no frame; fresh ones may carry only the frame."""
+        return bool(context) and (context.get('numeric_cols') is not None or 'df' in context)
+
+    @staticmethod
+    def _numeric_cols(context):
+        """Stored-profile columns from the load; derived from the frame once otherwise."""
+        if context.get('numeric_cols') is None:
+            context['numeric_cols'] = list(context['df'].select_dtypes(include=['number']).columns)
+        return context['numeric_cols']
+
     def draw(self, surface, x, y, context):
         self.rect.topleft = (x, y)
         
@@ -26,11 +38,10 @@ class AxisSelector:
         self.close_btn.rect.topleft = (x + 190, y + 5)
         self.close_btn.draw(surface, self.font)
 
-        if not context or 'df' not in context:
+        if not self._has_columns(context):
             return
 
-        df = context['df']
-        numeric_cols = df.select_dtypes(include=['number']).columns
+        numeric_cols = self._numeric_cols(context)
         
         # Column List
         start_y = y + 40
@@ -62,12 +73,11 @@ class AxisSelector:
             state.show_axis_selector = False
             return
 
-        if not self.rect.collidepoint(mouse_pos) or not context:
+        if not self.rect.collidepoint(mouse_pos) or not self._has_columns(context):
             state.show_axis_selector = False
             return
 
-        df = context['df']
-        numeric_cols = df.select_dtypes(include=['number']).columns
+        numeric_cols = self._numeric_cols(context)
         
         local_y = mouse_pos[1] - (self.rect.y + 40)
         idx = local_y // 25
@@ -88,7 +98,7 @@ class AxisSelector:
 
             state.processing_mode = "LOCAL"
             task_manager.add_task(worker_ctrl.worker_load_experiment, 
-                                  [state.selected_ids, new_x, new_y, True])
+                                  [state.selected_ids, new_x, new_y, True], key="plot")
 
 
 class SettingsMenu:
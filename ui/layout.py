@@ -45,6 +45,9 @@ class UILayout:
         # --- DROPDOWN ITEMS ---
         # File Dropdown
         self.dd_file_export = Button(20, 68, 140, 24, "EXPORT PROJECT", UITheme.PANEL_GREY)
+        self.dd_file_gc = Button(20, 94, 140, 24, "COMPACT VAULT", UITheme.PANEL_GREY)
+        self.dd_file_fsck = Button(20, 120, 140, 24, "VERIFY VAULT", UITheme.PANEL_GREY)
+        self.dd_file_import = Button(20, 146, 140, 24, "IMPORT FOLDER", UITheme.PANEL_GREY)
         
         # Edit Dropdown
         self.dd_edit_undo = Button(90, 68, 110, 24, "UNDO", UITheme.PANEL_GREY)
@@ -56,7 +59,7 @@ class UILayout:
         # Give menu/dropdowns a visible panel fill (especially in LIGHT mode)
         for b in [
             self.btn_menu_file, self.btn_menu_edit, self.btn_menu_ai,
-            self.dd_file_export,
+            self.dd_file_export, self.dd_file_gc, self.dd_file_fsck, self.dd_file_import,
             self.dd_edit_undo, self.dd_edit_redo, self.dd_edit_file,
             self.dd_ai_analyze
         ]:
@@ -0,0 +1,156 @@
+# --- FILE: ui/plot_widget.py ---
+import numpy as np
+import pygame
+from settings import UITheme
+
+SERIES_COLORS = {"primary": (255, 120, 0), "secondary": (0, 212, 255)}
+
+class PlotWidget:
+    """Native line plot drawn straight from the context's MinMaxPyramids.
+    Wheel zooms around the cursor, left-drag pans, right-click resets. The panel
+    is only redrawn when the data, view or theme changes."""
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.font = pygame.font.SysFont("Consolas", 10)
+        self.font_title = pygame.font.SysFont("Consolas", 12, bold=True)
+        self.margins = (52, 22, 10, 28)  # left, top, right, bottom
+        self.surface = pygame.Surface(self.rect.size)
+        self.context = None
+        self.view = None  # (x0, x1) in data coordinates
+        self.dragging = False
+        self._rendered_key = None
+
+    @property
+    def plot_area(self):
+        left, top, right, bottom = self.margins
+        return pygame.Rect(left, top, self.rect.width - left - right, self.rect.height - top - bottom)
+
+    def _bind(self, context):
+        if context is not self.context:
+            self.context = context
+            self.view = self._extent()
+
+    def _extent(self):
+        ranges = [p.x_range for p in self.context["pyramids"].values()]
+        x0, x1 = min(r[0] for r in ranges), max(r[1] for r in ranges)
+        return (x0, x1) if x1 > x0 else (x0 - 0.5, x0 + 0.5)
+
+    # --- INTERACTION ---
+    def zoom(self, mouse_pos, steps):
+        if not self.context:
+            return
+        area = self.plot_area
+        x0, x1 = self.view
+        rel = (mouse_pos[0] - self.rect.x - area.x) / max(1, area.width)
+        anchor = x0 + min(1.0, max(0.0, rel)) * (x1 - x0)
+        scale = 0.8 ** steps
+        lo, hi = self._extent()
+        span = min(hi - lo, max((x1 - x0) * scale, (hi - lo) * 1e-9))
+        new_x0 = anchor - (anchor - x0) * span / (x1 - x0)
+        self.view = self._clamp(new_x0, new_x0 + span)
+
+    def pan(self, dx_pixels):
+        if not self.context:
+            return
+        x0, x1 = self.view
+        shift = -dx_pixels * (x1 - x0) / max(1, self.plot_area.width)
+        self.view = self._clamp(x0 + shift, x1 + shift)
+
+    def reset(self):
+        if self.context:
+            self.view = self._extent()
+
+    def _clamp(self, x0, x1):
+        lo, hi = self._extent()
+        span = x1 - x0
+        if x0 < lo:
+            x0, x1 = lo, lo + span
+        if x1 > hi:
+            x0, x1 = max(lo, hi - span), hi
+        return (x0, x1)
+
+    def handle_event(self, event, mouse_pos):
+        """Returns True when the event was consumed by the plot."""
+        if not self.context:
+            return False
+        inside = self.rect.collidepoint(mouse_pos)
+        if event.type == pygame.MOUSEWHEEL and inside:
+            self.zoom(mouse_pos, event.y)
+            return True
+        if event.type == pygame.MOUSEBUTTONDOWN and inside:
+            if event.button == 1:
+                self.dragging = True
+                return True
+            if event.button == 3:
+                self.reset()
+                return True
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.dragging:
+            self.dragging = False
+            return True
+        if event.type == pygame.MOUSEMOTION and self.dragging:
+            self.pan(event.rel[0])
+            return True
+        return False
+
+    # --- DRAWING ---
+    def render(self, context):
+        """Returns the panel surface for `context`, redrawing only if something changed."""
+        self._bind(context)
+        key = (id(context), self.view, UITheme.BG_DARK, UITheme.PANEL_GREY)
+        if key != self._rendered_key:
+            self._draw()
+            self._rendered_key = key
+        return self.surface
+
+    def _draw(self):
+        surf = self.surface
+        area = self.plot_area
+        surf.fill(UITheme.PANEL_GREY)
+        pygame.draw.rect(surf, UITheme.BG_DARK, area)
+
+        x0, x1 = self.view
+        series = {name: p.query(x0, x1, area.width) for name, p in self.context["pyramids"].items()}
+        ys = [y for _, y in series.values() if len(y)]
+        if ys:
+            y0, y1 = min(float(y.min()) for y in ys), max(float(y.max()) for y in ys)
+        else:
+            y0, y1 = 0.0, 1.0
+        pad = (y1 - y0) * 0.05 or 0.5
+        y0, y1 = y0 - pad, y1 + pad
+        # Recorded for hit-testing (tooltip) in panel pixel coordinates
+        self.context["axes"] = [{"rect": tuple(area), "xlim": (x0, x1), "ylim": (y0, y1), "series": list(series)}]
+
+        self._draw_grid(area, x0, x1, y0, y1)
+
+        surf.set_clip(area)
+        for name, (x, y) in series.items():
+            if len(x) < 2:
+                continue
+            px = area.x + (x - x0) * (area.width / (x1 - x0))
+            py = area.bottom - (y - y0) * (area.height / (y1 - y0))
+            points = np.column_stack((px, py)).tolist()
+            pygame.draw.lines(surf, SERIES_COLORS.get(name, UITheme.ACCENT_ORANGE), False, points, 2)
+        surf.set_clip(None)
+        pygame.draw.rect(surf, UITheme.TEXT_DIM, area, 1)
+
+        ctx = self.context
+        title = "COMPARATIVE OVERLAY" if ctx.get("overlay") else f"{ctx['x_col']} vs {ctx['y_col']}"
+        lo, hi = self._extent()
+        if x1 - x0 < (hi - lo) * 0.999:
+            title += f"  [ZOOM {(hi - lo) / (x1 - x0):.1f}x]"
+        surf.blit(self.font_title.render(title, True, UITheme.ACCENT_ORANGE), (area.x, 4))
+
+    def _draw_grid(self, area, x0, x1, y0, y1):
+        for i in range(5):
+            t = i / 4
+            gx = area.x + int(t * area.width)
+            gy = area.bottom - int(t * area.height)
+            pygame.draw.line(self.surface, UITheme.GRID_COLOR, (gx, area.y), (gx, area.bottom))
+            pygame.draw.line(self.surface, UITheme.GRID_COLOR, (area.x, gy), (area.right, gy))
+            x_label = self.font.render(f"{x0 + t * (x1 - x0):.4g}", True, UITheme.TEXT_DIM)
+            y_label = self.font.render(f"{y0 + t * (y1 - y0):.4g}", True, UITheme.TEXT_DIM)
+            label_x = min(gx - x_label.get_width() // 2, self.rect.width - x_label.get_width() - 2)
+            self.surface.blit(x_label, (label_x, area.bottom + 4))
+            self.surface.blit(y_label, (area.x - y_label.get_width() - 4, gy - y_label.get_height() // 2))
+        x_name = self.font.render(str(self.context["x_col"]), True, UITheme.TEXT_OFF_WHITE)
+        self.surface.blit(x_name, (area.centerx - x_name.get_width() // 2, area.bottom + 15))
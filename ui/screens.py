@@ -1,10 +1,12 @@
 # --- FILE: ui/screens.py ---
 import pygame
 import os
+import numpy as np
 from settings import UITheme
 from state_manager import state
 from ui.layout import layout, SCREEN_CENTER_X
 from ui.components import draw_loading_overlay
+from ui.plot_widget import PlotWidget, SERIES_COLORS
 
 class RenderEngine:
     def __init__(self, screen):
@@ -45,6 +47,9 @@ class RenderEngine:
         self.icons['expand'] = load_icon("image/expand.png", (20, 20))
         self.icons['settings'] = load_icon("image/setting_icon.webp", (30, 30))
 
+        # Native (zoomable) plot panel, used when plot_mode is "native"
+        self.plot_widget = PlotWidget((850, 100, 400, 300))
+
     def draw_splash(self, mouse_pos):
         self.screen.fill(UITheme.BG_LOGIN)
         if self.logo_img: 
@@ -297,22 +302,44 @@ class RenderEngine:
         layout.btn_popup_download.draw(self.screen, self.font_bold)
 
     def draw_plot_tooltip(self, mouse_pos):
-        """Draws coordinates when hovering over the plot."""
-        rel_x = (mouse_pos[0] - 850) / 400.0
-        rel_x = max(0, min(1, rel_x)) 
+        """Draws the nearest data point of each series under the cursor.
+        Uses the render's axes transform and the context's x-sorted arrays (binary search)."""
         ctx = state.plot_context
-        df = ctx.get('df')
-        if df is not None and not df.empty:
-            idx = int(rel_x * (len(df) - 1))
-            row = df.iloc[idx]
-            x_val = row[ctx['x_col']] if ctx.get('x_col') else idx
-            y_val = row[ctx['y_col']] if ctx.get('y_col') else "N/A"
-            tt_text = f"X: {x_val} | Y: {y_val}"
-            tt_surf = self.font_small.render(tt_text, True, (255, 255, 255))
-            tt_bg = pygame.Rect(mouse_pos[0] + 10, mouse_pos[1] + 10, tt_surf.get_width() + 10, 20)
+        px, py = mouse_pos[0] - 850, mouse_pos[1] - 100
+        for axes in ctx.get("axes") or []:
+            left, top, w, h = axes["rect"]
+            if not (left <= px <= left + w and top <= py <= top + h) or w <= 0 or h <= 0:
+                continue
+            (x0, x1), (y0, y1) = axes["xlim"], axes["ylim"]
+            data_x = x0 + (px - left) / w * (x1 - x0)
+
+            lines = []
+            for name in axes["series"]:
+                xs, ys = (ctx.get("series") or {}).get(name, ((), ()))
+                if not len(xs):
+                    continue
+                i = int(np.searchsorted(xs, data_x))
+                if i == len(xs) or (i > 0 and data_x - xs[i - 1] <= xs[i] - data_x):
+                    i -= 1
+                x_val, y_val = xs[i], ys[i]
+                mx = 850 + left + (x_val - x0) / (x1 - x0) * w
+                my = 100 + top + (1 - (y_val - y0) / (y1 - y0)) * h
+                color = SERIES_COLORS.get(name, UITheme.ACCENT_ORANGE)
+                if 850 + left <= mx <= 850 + left + w and 100 + top <= my <= 100 + top + h:
+                    pygame.draw.circle(self.screen, color, (int(mx), int(my)), 4, 1)
+                label = f"{name[0].upper()} " if len(axes["series"]) > 1 else ""
+                lines.append((f"{label}X: {x_val:.6g} | Y: {y_val:.6g}", color))
+            if not lines:
+                return
+
+            surfs = [self.font_small.render(text, True, (255, 255, 255)) for text, _ in lines]
+            tt_bg = pygame.Rect(mouse_pos[0] + 10, mouse_pos[1] + 10, max(s.get_width() for s in surfs) + 10, 6 + 16 * len(surfs))
+            tt_bg.right = min(tt_bg.right, self.screen.get_width() - 2)
             pygame.draw.rect(self.screen, (20, 20, 25), tt_bg)
-            pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, tt_bg, 1)
-            self.screen.blit(tt_surf, (tt_bg.x + 5, tt_bg.y + 3))
+            pygame.draw.rect(self.screen, lines[0][1] if len(lines) == 1 else UITheme.ACCENT_ORANGE, tt_bg, 1)
+            for n, surf in enumerate(surfs):
+                self.screen.blit(surf, (tt_bg.x + 5, tt_bg.y + 3 + 16 * n))
+            return
 
     def draw_metadata_editor(self, mouse_pos):
         """Draws the right-side panel when editing notes."""
@@ -361,9 +388,10 @@ class RenderEngine:
 
         # FILE DROPDOWN
         if state.show_file_dropdown:
-            draw_dropdown_bg(pygame.Rect(20, 66, 140, 26))
-            layout.dd_file_export.check_hover(mouse_pos)
-            layout.dd_file_export.draw(self.screen, self.font_small)
+            draw_dropdown_bg(pygame.Rect(20, 66, 140, 104))
+            for b in [layout.dd_file_export, layout.dd_file_gc, layout.dd_file_fsck, layout.dd_file_import]:
+                b.check_hover(mouse_pos)
+                b.draw(self.screen, self.font_small)
 
         # EDIT DROPDOWN
         if state.show_edit_dropdown:
@@ -440,6 +468,9 @@ class RenderEngine:
 
         if not state.is_editing_metadata:
             # PLOT AREA
+            if state.plot_context and state.plot_context.get("pyramids"):
+                # Native plots: the widget redraws its surface only when data/view/theme changes
+                state.current_plot = self.plot_widget.render(state.plot_context)
             if state.current_plot: 
                 self.screen.blit(state.current_plot, (850, 100))
                 plot_rect = pygame.Rect(850, 100, 400, 300)